@@ -0,0 +1,303 @@
+"""
+Benchmark the API's hot endpoints and compare them with a JSON baseline.
+
+The application runs in-process (get_application() behind a TestClient), in
+a scratch directory holding synthetic iris-shaped data, with the in-memory
+Firestore stand-in and rate limits lifted. Each scenario reports its
+throughput and p50/p99 latency. The run fails when a scenario's p50 is
+more than `--threshold` slower than in the baseline.
+
+Usage (from the service root):
+    python -m benchmarks.bench_api                 # compare with benchmarks/baseline.json
+    python -m benchmarks.bench_api --save          # record a new baseline
+    python -m benchmarks.bench_api --quick --rows 1000
+
+The regression gate is this command against the committed baseline, e.g.
+    python -m benchmarks.bench_api --quick --threshold 2
+or, through pytest, RUN_BENCHMARKS=1 python -m pytest tests/test_benchmarks.py
+(off by default, since it depends on the machine's speed).
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, NamedTuple
+
+import numpy as np
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(SERVICE_ROOT, "benchmarks", "baseline.json")
+
+PREDICT_BATCH_SIZES = [1, 100, 1000]
+LOAD_DATASET_SIZES = [1_000, 10_000, 100_000]
+QUICK_LOAD_DATASET_SIZES = [1_000, 10_000]
+
+BENCH_ENV = {
+    "FIRESTORE_BACKEND": "memory",
+    "TOKEN_REVOCATION_BACKEND": "memory",
+    "RATE_LIMIT_BACKEND": "memory",
+    "RATE_LIMIT_PREDICT": "1000000000/1",
+    "RATE_LIMIT_TRAIN": "1000000000/1",
+    "RATE_LIMIT_TUNE": "1000000000/1",
+    # Each data_load request returns its whole dataset as one JSON page.
+    "DATASET_MAX_PAGE_SIZE": str(max(LOAD_DATASET_SIZES)),
+    "TOKEN_SECRET": "bench-api",
+    "APP_WARMUP": "0",
+    "LOG_LEVEL": "WARNING",
+}
+
+FEATURE_COLUMNS = ["SepalLengthCm", "SepalWidthCm", "PetalLengthCm", "PetalWidthCm"]
+SPECIES = ["Iris-setosa", "Iris-versicolor", "Iris-virginica"]
+SPECIES_MEANS = np.array([[5.0, 3.4, 1.5, 0.2], [5.9, 2.8, 4.3, 1.3], [6.6, 3.0, 5.6, 2.0]])
+SPECIES_STDS = np.array([[0.35, 0.38, 0.17, 0.1], [0.5, 0.3, 0.47, 0.2], [0.64, 0.32, 0.55, 0.27]])
+
+
+class Regression(NamedTuple):
+    """A scenario whose p50 latency grew beyond the threshold."""
+
+    scenario: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def change(self) -> float:
+        return self.current_ms / self.baseline_ms - 1
+
+
+def synthetic_iris(n_rows: int, seed: int = 42) -> Dict[str, np.ndarray]:
+    """
+    Draw iris-shaped rows: three species with their own feature distributions.
+
+    Args:
+        n_rows (int): The number of rows.
+        seed (int): The random seed, so runs use the same data.
+
+    Returns:
+        dict: The species codes and the (n_rows, 4) feature matrix.
+    """
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, len(SPECIES), size=n_rows)
+    features = rng.normal(SPECIES_MEANS[codes], SPECIES_STDS[codes]).clip(0.1).round(1)
+    return {"codes": codes, "features": features}
+
+
+def write_iris_csv(path: str, n_rows: int) -> None:
+    """Write a synthetic dataset with the columns of the Kaggle iris CSV."""
+    data = synthetic_iris(n_rows)
+    lines = ["Id," + ",".join(FEATURE_COLUMNS) + ",Species"]
+    for row_id, (row, code) in enumerate(zip(data["features"], data["codes"]), start=1):
+        lines.append(f"{row_id},{row[0]},{row[1]},{row[2]},{row[3]},{SPECIES[code]}")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def percentile_summary(durations: List[float], wall_time: float) -> Dict[str, float]:
+    """
+    Summarize request durations.
+
+    Args:
+        durations (list): The duration of each request, in seconds.
+        wall_time (float): The total time of the run, in seconds.
+
+    Returns:
+        dict: Iterations, throughput in requests per second and p50/p99 in ms.
+    """
+    p50, p99 = np.percentile(durations, [50, 99]) * 1000
+    return {
+        "iterations": len(durations),
+        "throughput_rps": round(len(durations) / wall_time, 2),
+        "p50_ms": round(float(p50), 3),
+        "p99_ms": round(float(p99), 3),
+    }
+
+
+def measure(call: Callable[[], Any], iterations: int, warmup: int = 1) -> Dict[str, float]:
+    """
+    Time `call` sequentially after a few untimed warm-up calls.
+
+    Args:
+        call (callable): One request.
+        iterations (int): The number of timed calls.
+        warmup (int): The number of untimed calls first.
+
+    Returns:
+        dict: See `percentile_summary`.
+    """
+    for _ in range(warmup):
+        call()
+    durations = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        call()
+        durations.append(time.perf_counter() - call_start)
+    return percentile_summary(durations, time.perf_counter() - start)
+
+
+def compare(baseline: Dict[str, Dict[str, float]], results: Dict[str, Dict[str, float]], threshold: float) -> List[Regression]:
+    """
+    Find the scenarios whose p50 latency regressed.
+
+    Scenarios missing from either side are ignored.
+
+    Args:
+        baseline (dict): The baseline metrics by scenario.
+        results (dict): The current metrics by scenario.
+        threshold (float): The tolerated slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+        list: The regressions.
+    """
+    regressions = []
+    for scenario, current in results.items():
+        previous = baseline.get(scenario)
+        if previous is None:
+            continue
+        if current["p50_ms"] > previous["p50_ms"] * (1 + threshold):
+            regressions.append(Regression(scenario, previous["p50_ms"], current["p50_ms"]))
+    return regressions
+
+
+def _ok(response) -> Any:
+    body = response.json()
+    if response.status_code >= 400 or (isinstance(body, dict) and "error" in body):
+        raise RuntimeError(f"{response.request.url}: {response.status_code} {body}")
+    return body
+
+
+def _run_pipeline(client) -> None:
+    _ok(client.get("/v1/data/preprocess"))
+    _ok(client.get("/v1/data/split"))
+    job = _ok(client.post("/v1/model/train"))
+    while job["status"] not in ("succeeded", "failed"):
+        time.sleep(0.01)
+        job = _ok(client.get(f"/v1/jobs/{job['job_id']}"))
+    if job["status"] == "failed":
+        raise RuntimeError(f"Training failed: {job.get('error')}")
+
+
+def run_benchmarks(rows: int, quick: bool) -> Dict[str, Dict[str, float]]:
+    """
+    Run every scenario in the current directory, which must be a scratch copy.
+
+    Args:
+        rows (int): The size of the dataset the pipeline trains on.
+        quick (bool): Whether to use fewer iterations and smaller datasets.
+
+    Returns:
+        dict: The metrics by scenario.
+    """
+    from fastapi.testclient import TestClient
+
+    from main import get_application
+    from src.services.data import DATASET_PATH
+
+    scale = 0.2 if quick else 1
+    results = {}
+    with TestClient(get_application()) as client:
+        for size in QUICK_LOAD_DATASET_SIZES if quick else LOAD_DATASET_SIZES:
+            write_iris_csv(DATASET_PATH, size)
+            iterations = max(3, int(scale * min(50, 2_000_000 // size)))
+            results[f"data_load_{size}"] = measure(
+                lambda: _ok(client.get("/v1/data/load", params={"limit": size})), iterations
+            )
+
+        write_iris_csv(DATASET_PATH, rows)
+        # The warm-up run pays for the first model fit's imports.
+        results["pipeline"] = measure(lambda: _run_pipeline(client), max(2, int(scale * 5)))
+
+        features = synthetic_iris(max(PREDICT_BATCH_SIZES), seed=7)["features"]
+        records = [dict(zip(FEATURE_COLUMNS, map(float, row))) for row in features]
+        for batch_size in PREDICT_BATCH_SIZES:
+            batch = records[:batch_size]
+            results[f"predict_{batch_size}"] = measure(
+                lambda: _ok(client.post("/v1/model/predict", json=batch)), max(10, int(scale * 200))
+            )
+
+        user = {"email": "bench@example.com", "password": "bench-password", "name": "Bench"}
+        _ok(client.post("/v1/register", json=user))
+        credentials = {"email": user["email"], "password": user["password"]}
+        results["login"] = measure(lambda: _ok(client.post("/v1/login", params=credentials)), max(5, int(scale * 20)))
+    return results
+
+
+def _environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def _print_results(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'scenario':<18} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'vs base':>8}")
+    for scenario, metrics in results.items():
+        previous = baseline.get(scenario)
+        change = f"{metrics['p50_ms'] / previous['p50_ms'] - 1:+.0%}" if previous else "-"
+        print(
+            f"{scenario:<18} {metrics['throughput_rps']:>10.1f} {metrics['p50_ms']:>10.2f} "
+            f"{metrics['p99_ms']:>10.2f} {change:>8}"
+        )
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000, help="rows of the dataset the pipeline trains on")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations and smaller datasets")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="the baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="tolerated p50 slowdown (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            recorded = json.load(f)
+        baseline = recorded["results"]
+        if recorded["environment"] != _environment():
+            print(f"Warning: the baseline was recorded on {recorded['environment']}.", file=sys.stderr)
+
+    for name, value in BENCH_ENV.items():
+        os.environ.setdefault(name, value)
+    # The app resolves its data, model and store paths against the working
+    # directory, so the run happens in a scratch copy of the service layout.
+    sys.path.insert(0, SERVICE_ROOT)
+    scratch = tempfile.mkdtemp(prefix="bench-api-")
+    cwd = os.getcwd()
+    try:
+        for directory in ("src/data", "src/models", "src/config"):
+            os.makedirs(os.path.join(scratch, directory))
+        shutil.copy(os.path.join(SERVICE_ROOT, "src/config/model_parameters.json"), os.path.join(scratch, "src/config"))
+        os.chdir(scratch)
+        results = run_benchmarks(args.rows, args.quick)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    _print_results(results, baseline)
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({"environment": _environment(), "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("No baseline to compare with; run with --save to record one.")
+        return 0
+    regressions = compare(baseline, results, args.threshold)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.scenario}: p50 {regression.baseline_ms:.2f} ms -> "
+            f"{regression.current_ms:.2f} ms ({regression.change:+.0%})",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Compare the compiled tree engine with sklearn's predict at several batch sizes.
+
+Usage (from the service root):
+    python -m benchmarks.bench_tree_engine
+"""
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.services.tree_engine import CompiledForest
+
+BATCH_SIZES = [1, 100, 100_000]
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    rng = np.random.default_rng(42)
+    X = rng.normal(loc=[5.8, 3.0, 3.7, 1.2], scale=[0.8, 0.4, 1.7, 0.7], size=(150, 4))
+    y = np.digitize(X[:, 2] + rng.normal(scale=0.5, size=150), [2.5, 4.8])
+    model = RandomForestClassifier(n_estimators=100, criterion="gini", random_state=42).fit(X, y)
+    forest = CompiledForest.from_sklearn(model)
+
+    print(f"{'rows':>8} {'sklearn ms':>12} {'compiled ms':>12} {'speedup':>8}")
+    for n_rows in BATCH_SIZES:
+        batch = rng.normal(loc=X.mean(0), scale=X.std(0), size=(n_rows, 4)).astype(np.float32)
+        repeat = 3 if n_rows > 10_000 else 50
+        sklearn_time = _best_of(lambda: model.predict(batch), repeat)
+        compiled_time = _best_of(lambda: forest.predict(batch), repeat)
+        print(
+            f"{n_rows:>8} {sklearn_time * 1e3:>12.3f} {compiled_time * 1e3:>12.3f} "
+            f"{sklearn_time / compiled_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
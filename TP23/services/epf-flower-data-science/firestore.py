@@ -1,43 +1,479 @@
+from __future__ import annotations
+
+import asyncio
+import copy
 import os
-from google.cloud import firestore
-from google.oauth2 import service_account
+import threading
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional
+from src.services.cache import TTLCache
+from src.services.metrics import metrics
+
+if TYPE_CHECKING:
+    from google.cloud import firestore
+    from google.oauth2 import service_account
+
+
+def _parse_ttls(value: str) -> Dict[str, float]:
+    """Parse "collection=seconds,..." into a TTL per collection."""
+    ttls = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        collection, seconds = item.split("=")
+        ttls[collection.strip()] = float(seconds)
+    return ttls
+
+
+# Collections not listed here are never cached.
+CACHE_TTLS = _parse_ttls(os.getenv("FIRESTORE_CACHE_TTLS", "users=30,parameters=300"))
+CACHE_MAX_ENTRIES = int(os.getenv("FIRESTORE_CACHE_MAX_ENTRIES", "1024"))
+# Missing documents are cached for at most this long (0: not at all), so a
+# document created by another worker is seen without waiting out the TTL.
+NEGATIVE_CACHE_TTL = float(os.getenv("FIRESTORE_NEGATIVE_CACHE_TTL", "0"))
+
+# Firestore accepts at most 500 writes per batch.
+MAX_BATCH_WRITES = 500
+MAX_BATCH_READS = 100
+BATCH_CONCURRENCY = int(os.getenv("FIRESTORE_BATCH_CONCURRENCY", "4"))
+
+
+def _load_credentials() -> service_account.Credentials:
+    # The Google client libraries are imported on first connection, not at startup.
+    from google.oauth2 import service_account
+
+    key_path = os.getenv("FIRESTORE_KEY_PATH", "src/config/firestore_key.json")
+    return service_account.Credentials.from_service_account_file(key_path)
+
+
+def _entry_ttl(ttl: Optional[float], value: Optional[dict]) -> Optional[float]:
+    """How long to cache a read value, shorter when the document is missing."""
+    if not ttl or value is not None:
+        return ttl
+    return min(ttl, NEGATIVE_CACHE_TTL)
+
+
+def _opened_transport(client):
+    """The gRPC transport of a Google client, or None if it never opened a channel."""
+    # Client.close() only closes the HTTP session, not the gRPC channel.
+    if getattr(client, "_firestore_api_internal", None) is None:
+        return None
+    return client._transport
+
+
+def _page_query(collection, limit: Optional[int], start_after: Optional[str], fields: Optional[List[str]]):
+    """Restrict a collection to one page, ordered by document ID, and to some fields."""
+    query = collection
+    if fields is not None:
+        query = query.select(fields)
+    if limit is not None or start_after is not None:
+        query = query.order_by("__name__")
+        if start_after is not None:
+            query = query.start_after({"__name__": start_after})
+        if limit is not None:
+            query = query.limit(limit)
+    return query
 
 
 class FirestoreClient:
-    """Wrapper around a database"""
+    """Wrapper around a database, connected on first use.
 
-    client: firestore.Client
+    The API serves requests through AsyncFirestoreClient. This synchronous
+    client is the module's original public interface. It is kept for
+    callers outside an event loop, such as scripts and notebooks, and is
+    only exercised by tests/test_firestore.py.
+    """
 
-    def __init__(self) -> None:
-        """Init the client."""
-    
-        key_path = os.getenv("FIRESTORE_KEY_PATH", "src/config/firestore_key.json")
-        
-        credentials = service_account.Credentials.from_service_account_file(key_path)
-        self.client = firestore.Client(credentials=credentials)
+    def __init__(
+        self,
+        cache_ttls: Optional[Dict[str, float]] = None,
+        cache_max_entries: int = CACHE_MAX_ENTRIES,
+    ) -> None:
+        """Init the client without connecting.
+        Args:
+            cache_ttls: Seconds documents of each collection are cached for;
+                FIRESTORE_CACHE_TTLS by default.
+            cache_max_entries: The number of documents kept in the cache.
+        """
+        self._client: Optional[firestore.Client] = None
+        self._connect_lock = threading.Lock()
+        self.cache_ttls = CACHE_TTLS if cache_ttls is None else cache_ttls
+        self.cache = TTLCache(cache_max_entries)
+
+    @property
+    def client(self) -> firestore.Client:
+        """The underlying client; credentials are loaded on first access."""
+        if self._client is None:
+            with self._connect_lock:
+                if self._client is None:
+                    from google.cloud import firestore
+
+                    self._client = firestore.Client(credentials=_load_credentials())
+        return self._client
+
+    @client.setter
+    def client(self, client: firestore.Client) -> None:
+        self._client = client
+
+    def close(self) -> None:
+        """Close the connection; the next call reconnects."""
+        with self._connect_lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+            transport = _opened_transport(client)
+            if transport is not None:
+                transport.close()
 
     def get(self, collection_name: str, document_id: str) -> dict:
-        """Find one document by ID.
+        """Find one document by ID, from the cache when the collection is cached.
         Args:
             collection_name: The collection name
             document_id: The document id
         Return:
             Document value.
         """
+        ttl = self.cache_ttls.get(collection_name)
+        key = (collection_name, document_id)
+        if ttl:
+            found, value = self.cache.get(key)
+            if found:
+                return copy.deepcopy(value)
+
         doc = self.client.collection(
             collection_name).document(document_id).get()
-        if doc.exists:
-            return doc.to_dict()
-        return None
+        value = doc.to_dict() if doc.exists else None
+        ttl = _entry_ttl(ttl, value)
+        if ttl:
+            self.cache.set(key, copy.deepcopy(value), ttl)
+        return value
 
     def create(self, collection_name: str, document_id: str, data: dict) -> None:
-        """Create a new document."""
+        """Create a new document, writing it through to the cache."""
         self.client.collection(collection_name).document(document_id).set(data)
+        ttl = self.cache_ttls.get(collection_name)
+        if ttl:
+            self.cache.set((collection_name, document_id), copy.deepcopy(data), ttl)
 
     def update(self, collection_name: str, document_id: str, updates: dict) -> None:
-        """Update an existing document."""
-        self.client.collection(collection_name).document(document_id).update(updates)
+        """Update an existing document and drop its cached copy."""
+        try:
+            self.client.collection(collection_name).document(document_id).update(updates)
+        finally:
+            self.cache.invalidate((collection_name, document_id))
+
+    def list_all_documents(
+        self,
+        collection_name: str,
+        limit: Optional[int] = None,
+        start_after: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ):
+        """List the documents in a collection, optionally one page at a time.
+        Args:
+            collection_name: The collection name
+            limit: The maximum number of documents, in document ID order.
+            start_after: Only list documents whose ID sorts after this one.
+            fields: Only read these fields of each document.
+        Return:
+            A stream of document snapshots.
+        """
+        return _page_query(self.client.collection(collection_name), limit, start_after, fields).stream()
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Return the document cache hit and miss counters."""
+        return self.cache.stats()
+
+
+class AsyncFirestoreClient:
+    """Async wrapper around a database, connected on first use."""
+
+    def __init__(
+        self,
+        cache_ttls: Optional[Dict[str, float]] = None,
+        cache_max_entries: int = CACHE_MAX_ENTRIES,
+    ) -> None:
+        """Init the client without connecting.
+        Args:
+            cache_ttls: Seconds documents of each collection are cached for;
+                FIRESTORE_CACHE_TTLS by default.
+            cache_max_entries: The number of documents kept in the cache.
+        """
+        self._client: Optional[firestore.AsyncClient] = None
+        self.cache_ttls = CACHE_TTLS if cache_ttls is None else cache_ttls
+        self.cache = TTLCache(cache_max_entries)
+        self.batch_concurrency = BATCH_CONCURRENCY
+
+    @property
+    def client(self) -> firestore.AsyncClient:
+        """The underlying client; credentials are loaded on first access."""
+        if self._client is None:
+            from google.cloud import firestore
+
+            self._client = firestore.AsyncClient(credentials=_load_credentials())
+        return self._client
+
+    @client.setter
+    def client(self, client: firestore.AsyncClient) -> None:
+        self._client = client
+
+    async def close(self) -> None:
+        """Close the connection; the next call reconnects."""
+        client, self._client = self._client, None
+        if client is not None:
+            client.close()
+            transport = _opened_transport(client)
+            if transport is not None:
+                await transport.close()
+
+    async def get(self, collection_name: str, document_id: str) -> Optional[dict]:
+        """Find one document by ID, from the cache when the collection is cached.
+        Args:
+            collection_name: The collection name
+            document_id: The document id
+        Return:
+            Document value.
+        """
+        ttl = self.cache_ttls.get(collection_name)
+        key = (collection_name, document_id)
+        if ttl:
+            found, value = self.cache.get(key)
+            if found:
+                return copy.deepcopy(value)
+
+        with metrics.span("firestore_read"):
+            value = await self._read(collection_name, document_id)
+        ttl = _entry_ttl(ttl, value)
+        if ttl:
+            self.cache.set(key, copy.deepcopy(value), ttl)
+        return value
+
+    async def create(self, collection_name: str, document_id: str, data: dict) -> None:
+        """Create a new document, writing it through to the cache."""
+        with metrics.span("firestore_write"):
+            await self._write(collection_name, document_id, data)
+        ttl = self.cache_ttls.get(collection_name)
+        if ttl:
+            self.cache.set((collection_name, document_id), copy.deepcopy(data), ttl)
+
+    async def update(self, collection_name: str, document_id: str, updates: dict) -> None:
+        """Update an existing document and drop its cached copy."""
+        try:
+            with metrics.span("firestore_update"):
+                await self._update(collection_name, document_id, updates)
+        finally:
+            self.cache.invalidate((collection_name, document_id))
+
+    async def get_many(self, collection_name: str, document_ids: List[str]) -> Dict[str, Optional[dict]]:
+        """Find several documents by ID, in batched reads for those not cached.
+        Args:
+            collection_name: The collection name
+            document_ids: The document ids
+        Return:
+            Each document value by ID, None for missing documents.
+        """
+        ttl = self.cache_ttls.get(collection_name)
+        documents: Dict[str, Optional[dict]] = {}
+        missing = []
+        for document_id in dict.fromkeys(document_ids):
+            found, value = self.cache.get((collection_name, document_id)) if ttl else (False, None)
+            if found:
+                documents[document_id] = copy.deepcopy(value)
+            else:
+                missing.append(document_id)
+
+        async def read(chunk: List[str]) -> Dict[str, Optional[dict]]:
+            with metrics.span("firestore_read_batch"):
+                return await self._read_many(collection_name, chunk)
+
+        for chunk_documents in await self._gather_chunks(missing, MAX_BATCH_READS, read):
+            for document_id, value in chunk_documents.items():
+                documents[document_id] = value
+                entry_ttl = _entry_ttl(ttl, value)
+                if entry_ttl:
+                    self.cache.set((collection_name, document_id), copy.deepcopy(value), entry_ttl)
+        return documents
+
+    async def create_many(self, collection_name: str, documents: Dict[str, dict]) -> None:
+        """Create several documents in batched writes.
+
+        Each batch of up to 500 documents is atomic; if one batch fails,
+        batches already committed are kept.
+        Args:
+            collection_name: The collection name
+            documents: The document values by ID.
+        """
+        async def write(chunk: List[str]) -> None:
+            with metrics.span("firestore_write_batch"):
+                await self._write_many(collection_name, {document_id: documents[document_id] for document_id in chunk})
+            ttl = self.cache_ttls.get(collection_name)
+            if ttl:
+                for document_id in chunk:
+                    self.cache.set((collection_name, document_id), copy.deepcopy(documents[document_id]), ttl)
+
+        await self._gather_chunks(list(documents), MAX_BATCH_WRITES, write)
+
+    async def update_many(self, collection_name: str, updates: Dict[str, dict]) -> None:
+        """Update several existing documents in batched writes.
+
+        Each batch of up to 500 documents is atomic; if one batch fails,
+        batches already committed are kept.
+        Args:
+            collection_name: The collection name
+            updates: The field updates by document ID.
+        """
+        async def write(chunk: List[str]) -> None:
+            try:
+                with metrics.span("firestore_update_batch"):
+                    await self._update_many(collection_name, {document_id: updates[document_id] for document_id in chunk})
+            finally:
+                for document_id in chunk:
+                    self.cache.invalidate((collection_name, document_id))
+
+        await self._gather_chunks(list(updates), MAX_BATCH_WRITES, write)
+
+    async def _gather_chunks(
+        self,
+        items: List[str],
+        size: int,
+        run: Callable[[List[str]], Awaitable[Any]],
+    ) -> List[Any]:
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def run_chunk(chunk: List[str]) -> Any:
+            async with semaphore:
+                return await run(chunk)
+
+        return await asyncio.gather(*(run_chunk(items[i:i + size]) for i in range(0, len(items), size)))
+
+    def list_all_documents(
+        self,
+        collection_name: str,
+        limit: Optional[int] = None,
+        start_after: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> AsyncIterator[Any]:
+        """List the documents in a collection, optionally one page at a time.
+        Args:
+            collection_name: The collection name
+            limit: The maximum number of documents, in document ID order.
+            start_after: Only list documents whose ID sorts after this one.
+            fields: Only read these fields of each document.
+        Return:
+            An async iterator of document snapshots.
+        """
+        return self._stream(collection_name, limit, start_after, fields)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Return the document cache hit and miss counters."""
+        return self.cache.stats()
+
+    async def _read(self, collection_name: str, document_id: str) -> Optional[dict]:
+        doc = await self.client.collection(collection_name).document(document_id).get()
+        return doc.to_dict() if doc.exists else None
+
+    async def _write(self, collection_name: str, document_id: str, data: dict) -> None:
+        await self.client.collection(collection_name).document(document_id).set(data)
+
+    async def _update(self, collection_name: str, document_id: str, updates: dict) -> None:
+        await self.client.collection(collection_name).document(document_id).update(updates)
+
+    async def _read_many(self, collection_name: str, document_ids: List[str]) -> Dict[str, Optional[dict]]:
+        collection = self.client.collection(collection_name)
+        documents: Dict[str, Optional[dict]] = dict.fromkeys(document_ids)
+        async for doc in self.client.get_all([collection.document(document_id) for document_id in document_ids]):
+            if doc.exists:
+                documents[doc.id] = doc.to_dict()
+        return documents
+
+    async def _write_many(self, collection_name: str, documents: Dict[str, dict]) -> None:
+        collection = self.client.collection(collection_name)
+        batch = self.client.batch()
+        for document_id, data in documents.items():
+            batch.set(collection.document(document_id), data)
+        await batch.commit()
+
+    async def _update_many(self, collection_name: str, updates: Dict[str, dict]) -> None:
+        collection = self.client.collection(collection_name)
+        batch = self.client.batch()
+        for document_id, fields in updates.items():
+            batch.update(collection.document(document_id), fields)
+        await batch.commit()
+
+    def _stream(
+        self,
+        collection_name: str,
+        limit: Optional[int] = None,
+        start_after: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> AsyncIterator[Any]:
+        return _page_query(self.client.collection(collection_name), limit, start_after, fields).stream()
+
+
+class MemoryDocument(NamedTuple):
+    """A document snapshot returned by the in-memory backend."""
+
+    id: str
+    data: dict
+
+    def to_dict(self) -> dict:
+        return copy.deepcopy(self.data)
+
+
+class MemoryFirestoreClient(AsyncFirestoreClient):
+    """In-process stand-in for Firestore, for offline runs and load tests."""
+
+    def __init__(self) -> None:
+        """Init an empty database; nothing is cached since reads are local."""
+        super().__init__(cache_ttls={})
+        self.collections: Dict[str, Dict[str, dict]] = {}
+
+    async def _read(self, collection_name: str, document_id: str) -> Optional[dict]:
+        return copy.deepcopy(self.collections.get(collection_name, {}).get(document_id))
+
+    async def _write(self, collection_name: str, document_id: str, data: dict) -> None:
+        self.collections.setdefault(collection_name, {})[document_id] = copy.deepcopy(data)
+
+    async def _read_many(self, collection_name: str, document_ids: List[str]) -> Dict[str, Optional[dict]]:
+        return {document_id: await self._read(collection_name, document_id) for document_id in document_ids}
+
+    async def _write_many(self, collection_name: str, documents: Dict[str, dict]) -> None:
+        for document_id, data in documents.items():
+            await self._write(collection_name, document_id, data)
+
+    async def _update_many(self, collection_name: str, updates: Dict[str, dict]) -> None:
+        # Like a batch, nothing is written if one document is missing.
+        for document_id in updates:
+            self._existing(collection_name, document_id)
+        for document_id, fields in updates.items():
+            await self._update(collection_name, document_id, fields)
+
+    def _existing(self, collection_name: str, document_id: str) -> dict:
+        document = self.collections.get(collection_name, {}).get(document_id)
+        if document is None:
+            # Imported here: google.api_core pulls in grpc, which startup defers.
+            from google.api_core.exceptions import NotFound
+
+            raise NotFound(f"No document to update: {collection_name}/{document_id}")
+        return document
+
+    async def _update(self, collection_name: str, document_id: str, updates: dict) -> None:
+        document = self._existing(collection_name, document_id)
+        for field_path, value in updates.items():
+            *parents, field = field_path.split(".")
+            target = document
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[field] = copy.deepcopy(value)
 
-    def list_all_documents(self, collection_name: str):
-        """List all documents in a collection."""
-        return self.client.collection(collection_name).stream()   
+    async def _stream(
+        self,
+        collection_name: str,
+        limit: Optional[int] = None,
+        start_after: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> AsyncIterator[MemoryDocument]:
+        documents = sorted(self.collections.get(collection_name, {}).items())
+        if start_after is not None:
+            documents = [(document_id, data) for document_id, data in documents if document_id > start_after]
+        for document_id, data in documents[:limit]:
+            if fields is not None:
+                data = {field: data[field] for field in fields if field in data}
+            yield MemoryDocument(document_id, data)
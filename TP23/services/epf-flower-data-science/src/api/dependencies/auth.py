@@ -1,22 +1,79 @@
-from fastapi import HTTPException, Depends
-from firestore import FirestoreClient
-from datetime import datetime
+import os
+from fastapi import HTTPException, Depends, Query
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from typing import Optional
+from src.api.dependencies import rate_limit as rate_limit_dependencies
+from src.api.dependencies.database import firestore_client
+from src.services.log import get_logger, log_payload
+from src.services.revocation import create_revocation_store
+from src.services.tokens import InvalidToken, token_signer
 
 
-firestore_client = FirestoreClient()
+logger = get_logger("auth", sampled=True)
 
-invalidated_tokens = []
+# "sqlite" shares logouts between the workers of a host, "firestore" between hosts.
+TOKEN_REVOCATION_BACKEND = os.getenv("TOKEN_REVOCATION_BACKEND", "sqlite")
+TOKEN_REVOCATION_DB = os.getenv("TOKEN_REVOCATION_DB", "src/data/database.sqlite")
+revocation_store = create_revocation_store(TOKEN_REVOCATION_BACKEND, TOKEN_REVOCATION_DB, firestore_client)
 
 
-def validate_token(token: str):
-    print(f"Received token in validate_token: {token}")  # Debugging
-    if token in invalidated_tokens:
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def get_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    token: Optional[str] = Query(None, description="Access token, if not sent as a Bearer header"),
+) -> str:
+    """
+    Read the access token from the Authorization header or the query.
+
+    Returns:
+        str: The raw token.
+
+    Raises:
+        HTTPException: If no token was sent.
+    """
+    if credentials is not None:
+        return credentials.credentials
+    if token:
+        return token
+    raise HTTPException(status_code=401, detail="Missing token.")
+
+
+async def get_token_claims(token: str = Depends(get_token)) -> dict:
+    """
+    Verify the access token.
+
+    Args:
+        token (str): The raw token.
+
+    Returns:
+        dict: The token claims, with the email as `sub` and the user's role.
+
+    Raises:
+        HTTPException: If the token is invalid, expired or revoked.
+    """
+    try:
+        claims = token_signer.verify(token)
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    if await revocation_store.is_revoked(token):
         raise HTTPException(status_code=401, detail="Token has been invalidated.")
-    if not token.startswith("token-for-"):
-        raise HTTPException(status_code=401, detail="Invalid token format.")
-    email = token.replace("token-for-", "")
-    print(f"Extracted email: {email}")  # Debugging
-    return email
+    log_payload(logger, "Token validated for %s", lambda: claims["sub"])
+    return claims
+
+
+def validate_token(claims: dict = Depends(get_token_claims)) -> str:
+    """
+    Return the email of the token's user.
+
+    Args:
+        claims (dict): The verified token claims.
+
+    Returns:
+        str: The email of the authenticated user.
+    """
+    return claims["sub"]
 
 
 def get_current_user(token: str = Depends(validate_token)):
@@ -32,37 +89,34 @@ def get_current_user(token: str = Depends(validate_token)):
     return token
 
 
-def get_current_user_with_role(
-    token: str = Depends(validate_token), role: str = "user"
-):
+def get_current_user_with_role(claims: dict = Depends(get_token_claims), role: str = "user"):
     """
     Extract the current user from the token and verify their role.
 
+    The role is read from the token, without a database lookup.
+
     Args:
-        token (str): The Bearer Token.
+        claims (dict): The verified token claims.
         role (str): The required role for the user (default is "user").
 
     Returns:
-        dict: The user object from Firestore.
+        dict: The email and role of the user.
 
     Raises:
         HTTPException: If the user's role does not match the required role.
     """
-    email = validate_token(token)
-    user = firestore_client.get("users", email)
-
-    if user["role"] != role:
+    if claims.get("role") != role:
         raise HTTPException(status_code=403, detail="Not enough permissions.")
 
-    return user
+    return {"email": claims["sub"], "role": claims["role"]}
 
 
-def get_current_admin(token: str = Depends(validate_token)):
+def get_current_admin(claims: dict = Depends(get_token_claims)):
     """
     Verify that the current user is an admin.
 
     Args:
-        token (str): The Bearer Token.
+        claims (dict): The verified token claims.
 
     Returns:
         str: The email of the authenticated admin user.
@@ -70,18 +124,14 @@ def get_current_admin(token: str = Depends(validate_token)):
     Raises:
         HTTPException: If the user is not an admin.
     """
-    email = validate_token(token)
-    user = firestore_client.get("users", email)
-    if user["role"] != "admin":
+    if claims.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions.")
-    return email
-
+    return claims["sub"]
 
-rate_limit_data = {}
 
 def rate_limit(user_id: str, limit: int = 10, interval: int = 60):
     """
-    Implements rate limiting using a Python dictionary.
+    Implements rate limiting with a sliding-window counter per user.
 
     Args:
         user_id (str): The unique identifier of the user.
@@ -91,16 +141,6 @@ def rate_limit(user_id: str, limit: int = 10, interval: int = 60):
     Raises:
         HTTPException: If the user exceeds the rate limit.
     """
-    now = datetime.now()
-    
-    if user_id in rate_limit_data:
-        request_times = rate_limit_data[user_id]
-        
-        rate_limit_data[user_id] = [t for t in request_times if (now - t).seconds < interval]
-
-        if len(rate_limit_data[user_id]) >= limit:
-            raise HTTPException(status_code=429, detail="Rate limit exceeded")
-        else:
-            rate_limit_data[user_id].append(now)
-    else:
-        rate_limit_data[user_id] = [now]
\ No newline at end of file
+    result = rate_limit_dependencies.rate_limiter.hit(f"limited:{user_id}", limit, interval)
+    if not result.allowed:
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
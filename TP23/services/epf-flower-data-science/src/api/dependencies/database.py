@@ -0,0 +1,30 @@
+import os
+from firestore import AsyncFirestoreClient, MemoryFirestoreClient
+
+# "firestore" for Google Cloud Firestore, "memory" for an in-process stand-in.
+FIRESTORE_BACKEND = os.getenv("FIRESTORE_BACKEND", "firestore")
+
+
+def _create_client() -> AsyncFirestoreClient:
+    if FIRESTORE_BACKEND == "memory":
+        return MemoryFirestoreClient()
+    return AsyncFirestoreClient()
+
+
+# One client, and so one gRPC channel, per process.
+firestore_client = _create_client()
+
+
+def get_firestore_client() -> AsyncFirestoreClient:
+    """
+    Provide the process-wide Firestore client.
+
+    Returns:
+        AsyncFirestoreClient: The shared client; it connects on first use.
+    """
+    return firestore_client
+
+
+async def close_firestore_client() -> None:
+    """Close the shared client's connection on application shutdown."""
+    await firestore_client.close()
@@ -0,0 +1,67 @@
+import math
+import os
+from typing import Callable
+from fastapi import HTTPException, Request
+from src.services.rate_limit import create_rate_limiter, parse_limit
+from src.services.tokens import InvalidToken, token_signer
+
+# "memory" limits each worker separately, "sqlite" shares the counters between the workers of a host.
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "src/data/database.sqlite")
+rate_limiter = create_rate_limiter(RATE_LIMIT_BACKEND, RATE_LIMIT_DB)
+
+PREDICT_RATE_LIMIT = parse_limit(os.getenv("RATE_LIMIT_PREDICT", "600/60"))
+TRAIN_RATE_LIMIT = parse_limit(os.getenv("RATE_LIMIT_TRAIN", "10/60"))
+TUNE_RATE_LIMIT = parse_limit(os.getenv("RATE_LIMIT_TUNE", "2/60"))
+REGISTER_BATCH_RATE_LIMIT = parse_limit(os.getenv("RATE_LIMIT_REGISTER_BATCH", "2/60"))
+
+
+def client_key(request: Request) -> str:
+    """
+    Identify the caller: the token's user when authenticated, else the client address.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        str: The rate limit key.
+    """
+    authorization = request.headers.get("authorization", "")
+    token = authorization[7:] if authorization.lower().startswith("bearer ") else request.query_params.get("token")
+    if token:
+        try:
+            return f"user:{token_signer.verify(token)['sub']}"
+        except InvalidToken:
+            pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def rate_limited(
+    scope: str,
+    limit: int,
+    interval: float,
+    key: Callable[[Request], str] = client_key,
+) -> Callable:
+    """
+    Build a dependency limiting each caller to `limit` requests per `interval` seconds.
+
+    Args:
+        scope (str): The name of the limit; routes sharing a scope share a budget.
+        limit (int): The number of requests allowed per interval.
+        interval (float): The window length in seconds.
+        key (callable): Maps a request to the caller it is counted against.
+
+    Returns:
+        callable: The dependency, raising HTTP 429 with Retry-After when exceeded.
+    """
+    # A plain function, so FastAPI runs the (possibly blocking) sqlite limiter in its threadpool.
+    def check_rate_limit(request: Request) -> None:
+        result = rate_limiter.hit(f"{scope}:{key(request)}", limit, interval)
+        if not result.allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(math.ceil(result.retry_after))},
+            )
+
+    return check_rate_limit
@@ -0,0 +1,195 @@
+import email.utils
+import gzip
+import hashlib
+import importlib.util
+import os
+from functools import lru_cache
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from src.services.cache import TTLCache
+from src.services.utils import file_digest
+
+RESPONSE_CACHE_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES", "64"))
+# Larger bodies are rendered per request, so the cache holds at most
+# RESPONSE_CACHE_ENTRIES * RESPONSE_CACHE_MAX_BODY_BYTES bytes.
+RESPONSE_CACHE_MAX_BODY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BODY_BYTES", str(1 << 20)))
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+
+# Encoded bodies are keyed by their ETag, so they never go stale; the
+# cache only bounds how many are kept, and how large they are.
+response_cache = TTLCache(RESPONSE_CACHE_ENTRIES)
+_FOREVER = float("inf")
+
+Render = Callable[[], Tuple[bytes, Dict[str, str]]]
+
+
+def _remember(key: Hashable, entry: Tuple[bytes, Dict[str, str], str]) -> None:
+    if len(entry[0]) <= RESPONSE_CACHE_MAX_BODY_BYTES:
+        response_cache.set(key, entry, _FOREVER)
+
+
+@lru_cache(maxsize=None)
+def _zstd_available() -> bool:
+    # zstandard is in requirements.txt; on an install without it, clients
+    # are offered gzip only.
+    return importlib.util.find_spec("zstandard") is not None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> str:
+    """
+    Pick the response encoding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding (str): The header value, if any.
+
+    Returns:
+        str: "zstd", "gzip" or "identity"; zstd wins ties when available.
+    """
+    if not accept_encoding:
+        return "identity"
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        if params.strip().startswith("q="):
+            try:
+                weight = float(params.strip()[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    supported = ["zstd", "gzip"] if _zstd_available() else ["gzip"]
+    wildcard = weights.get("*", 0.0)
+    best, best_weight = "identity", 0.0
+    for encoding in supported:
+        weight = weights.get(encoding, wildcard)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def content_etag(body: bytes) -> str:
+    """Weak ETag of a response body, which stays valid whatever the encoding."""
+    return f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def file_validators(path: str) -> Tuple[str, float]:
+    """
+    ETag and modification time of a file, from its (memoized) content hash.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        tuple: The weak ETag and the mtime as a Unix time.
+    """
+    return f'W/"{file_digest(path)[:32]}"', os.stat(path).st_mtime
+
+
+def _weak(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def validator_headers(etag: str, last_modified: Optional[float] = None) -> Dict[str, str]:
+    """Headers announcing a representation's validators."""
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if last_modified is not None:
+        headers["Last-Modified"] = email.utils.formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[float] = None) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when it is absent.
+
+    Args:
+        request (Request): The request.
+        etag (str): The current ETag.
+        last_modified (float): The current modification time, if known.
+
+    Returns:
+        bool: Whether the client's copy is still current.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or _weak(etag) in {_weak(tag) for tag in tags}
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+def not_modified(etag: str, last_modified: Optional[float] = None) -> Response:
+    """A 304 response carrying the validators."""
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+
+def cached_response(
+    request: Request,
+    key: Hashable,
+    etag: str,
+    render: Render,
+    last_modified: Optional[float] = None,
+    media_type: str = "application/json",
+) -> Response:
+    """
+    Serve a representation with conditional GET and cached compressed bodies.
+
+    Answers 304 when the client's validators match. Otherwise the body is
+    taken from the cache for this key, ETag and negotiated encoding; only
+    on a miss is it rendered (once per ETag) and compressed (once per
+    encoding). Bodies under COMPRESSION_MIN_BYTES are sent uncompressed;
+    bodies over RESPONSE_CACHE_MAX_BODY_BYTES are not cached.
+
+    Args:
+        request (Request): The request.
+        key: Identifies the resource and its query parameters.
+        etag (str): The current ETag of the representation.
+        render (callable): Builds the identity body and any extra headers.
+        last_modified (float): The modification time, if known.
+        media_type (str): The content type.
+
+    Returns:
+        Response: The 304 or the full response.
+    """
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    found, entry = response_cache.get((key, etag, encoding))
+    if not found:
+        found, identity = response_cache.get((key, etag, "identity"))
+        if not found:
+            identity = (*render(), "identity")
+            _remember((key, etag, "identity"), identity)
+        body, extra_headers, _ = identity
+        if encoding != "identity" and len(body) >= COMPRESSION_MIN_BYTES:
+            entry = (_compress(body, encoding), extra_headers, encoding)
+        else:
+            entry = identity
+        _remember((key, etag, encoding), entry)
+
+    body, extra_headers, content_encoding = entry
+    headers = {**validator_headers(etag, last_modified), **extra_headers}
+    if content_encoding != "identity":
+        headers["Content-Encoding"] = content_encoding
+    return Response(body, media_type=media_type, headers=headers)
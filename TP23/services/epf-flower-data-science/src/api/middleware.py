@@ -0,0 +1,60 @@
+import time
+from typing import Any, Callable, Dict
+
+from src.services.metrics import Metrics
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Record the latency, status and body size of every HTTP request.
+
+    Written as a plain ASGI middleware rather than with BaseHTTPMiddleware,
+    so streamed responses pass through untouched. Requests are labelled
+    with their route template, not their raw path, to keep the number of
+    series bounded.
+    """
+
+    def __init__(self, app: Callable, metrics: Metrics) -> None:
+        self.app = app
+        self.metrics = metrics
+        self._routes: Dict[Any, str] = {}
+
+    def _route(self, scope: dict) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        route = self._routes.get(endpoint)
+        if route is None:
+            self._routes = {
+                getattr(r, "endpoint", None): r.path for r in scope["app"].routes if hasattr(r, "path")
+            }
+            route = self._routes.get(endpoint, UNMATCHED_ROUTE)
+        return route
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: dict) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.metrics.in_flight.add(1)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.in_flight.add(-1)
+            self.metrics.observe_request(
+                scope["method"], self._route(scope), status, time.perf_counter() - start, size
+            )
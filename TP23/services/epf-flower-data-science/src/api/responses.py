@@ -0,0 +1,55 @@
+from typing import Any
+
+import numpy as np
+import orjson
+from fastapi.responses import JSONResponse
+
+# pandas writes at most 15 significant digits.
+FRAME_DOUBLE_PRECISION = 15
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        # Arrays orjson cannot read in place: strings, objects, non-contiguous views.
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    # pandas is only loaded by the routes that build frames.
+    to_json = getattr(obj, "to_json", None)
+    if to_json is not None and type(obj).__module__.startswith("pandas"):
+        orient = "records" if obj.ndim == 2 else "values"
+        return orjson.Fragment(to_json(orient=orient, double_precision=FRAME_DOUBLE_PRECISION))
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize content to JSON with orjson.
+
+    NumPy arrays and scalars are encoded straight from their buffers.
+    pandas frames become a list of records and series a list of values,
+    both written by pandas' own encoder and embedded without re-parsing.
+
+    Args:
+        content: The value to serialize.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    return orjson.dumps(
+        content,
+        default=_default,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+    )
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson, for large payloads.
+
+    Routes that return it directly also skip FastAPI's `jsonable_encoder`
+    pass, so arrays and frames can be passed as they are.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,7 +1,7 @@
 """API Router for Fast API."""
 from fastapi import APIRouter
 
-from src.api.routes import hello, data, parameters, authentication
+from src.api.routes import hello, data, parameters, authentication, pipeline, jobs, tuning
 
 # Step 19: API versioning
 router_v1 = APIRouter(prefix="/v1")
@@ -10,3 +10,6 @@ router_v1 .include_router(hello.router, tags=["Hello"])
 router_v1 .include_router(data.router, tags=["Dataset handling"])
 router_v1 .include_router(parameters.router, tags=["Firestore Parameters"])
 router_v1 .include_router(authentication.router, tags=["Authentication"])
+router_v1 .include_router(pipeline.router, tags=["Pipeline"])
+router_v1 .include_router(jobs.router, tags=["Jobs"])
+router_v1 .include_router(tuning.router, tags=["Tuning"])
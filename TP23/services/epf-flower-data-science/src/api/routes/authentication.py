@@ -1,95 +1,210 @@
+import json
 from fastapi import APIRouter, HTTPException, Depends, Query
-from google.cloud import firestore
-from passlib.context import CryptContext
-from firestore import FirestoreClient
-from src.schemas.user import User
-from src.api.dependencies.auth import validate_token
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+from firestore import AsyncFirestoreClient
+from src.schemas.user import User, UserBatch
+from src.api.dependencies.database import get_firestore_client
+from src.api.dependencies.auth import get_current_admin, get_token, get_token_claims, revocation_store
 from src.api.dependencies.auth import rate_limit
+from src.api.dependencies.rate_limit import REGISTER_BATCH_RATE_LIMIT, rate_limited
+from src.services.log import get_logger, log_payload
+from src.services.passwords import HasherBusy, password_hasher
+from src.services.tokens import token_signer
 
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-firestore_client = FirestoreClient()
-invalidated_tokens = []
+logger = get_logger("authentication")
+
+# Only these fields are read for listings; password hashes never leave Firestore.
+USER_FIELDS = ["email", "name", "role"]
+USERS_PAGE_SIZE = 100
 
 
 # Step 16: Authentication 
 @router.post("/register")
-def register_user(user: User):
+async def register_user(user: User, firestore_client: AsyncFirestoreClient = Depends(get_firestore_client)):
     """
     Register a new user in the Firestore database.
     Args:
         user (User): The user object containing email, password, name, and role.
+        firestore_client (AsyncFirestoreClient): The database client.
     Returns:
         dict: A success message upon successful registration.    
     """
     collection_name = "users"
-    existing_user = firestore_client.get(collection_name, user.email)
+    existing_user = await firestore_client.get(collection_name, user.email)
     
     if existing_user:
         raise HTTPException(status_code=400, detail="User already exists.")
     
-    hashed_password = pwd_context.hash(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except HasherBusy:
+        raise _hasher_busy()
     
-    firestore_client.create(
-        collection_name,
-        user.email,
-        {
-            "email": user.email,
-            "name": user.name,
-            "password": hashed_password,
-            "role": user.role,
-        }
-    )
+    await firestore_client.create(collection_name, user.email, _user_document(user, hashed_password))
     return {"message": "User registered successfully."}
 
 
+@router.post("/register/batch", dependencies=[Depends(rate_limited("register_batch", *REGISTER_BATCH_RATE_LIMIT))])
+async def register_users(
+    batch: UserBatch,
+    admin: str = Depends(get_current_admin),
+    firestore_client: AsyncFirestoreClient = Depends(get_firestore_client),
+):
+    """
+    Register many users with batched Firestore reads and writes (admin only).
+
+    Users that already exist, or appear twice in the request, are skipped.
+    Args:
+        batch (UserBatch): The users to register.
+        admin (str): The email of the admin making the request.
+        firestore_client (AsyncFirestoreClient): The database client.
+    Returns:
+        dict: The registered emails and the skipped ones with a reason.
+    """
+    users = {}
+    skipped = []
+    for user in batch.users:
+        if user.email in users:
+            skipped.append({"email": user.email, "reason": "Duplicate in request."})
+        else:
+            users[user.email] = user
+
+    existing = await firestore_client.get_many("users", list(users))
+    for email, document in existing.items():
+        if document:
+            skipped.append({"email": email, "reason": "User already exists."})
+            del users[email]
+
+    log_payload(logger, "Batch registration by %s", lambda: admin)
+    try:
+        hashed_passwords = await password_hasher.hash_many([user.password for user in users.values()])
+    except HasherBusy:
+        raise _hasher_busy()
+    await firestore_client.create_many(
+        "users",
+        {email: _user_document(user, hashed) for (email, user), hashed in zip(users.items(), hashed_passwords)},
+    )
+    return {"message": f"{len(users)} users registered.", "registered": list(users), "skipped": skipped}
+
+
+@router.get("/password/stats")
+def password_stats():
+    """
+    Report the password hashing pool's queue depth and latencies.
+
+    Returns:
+        dict: The hasher metrics.
+    """
+    return password_hasher.stats()
+
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many password operations in progress. Retry later.",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _user_document(user: User, hashed_password: str) -> dict:
+    return {
+        "email": user.email,
+        "name": user.name,
+        "password": hashed_password,
+        "role": user.role,
+    }
+
+
 # Step 17: User management
 @router.post("/login")
-def login_user(email: str, password: str):
+async def login_user(
+    email: str,
+    password: str,
+    firestore_client: AsyncFirestoreClient = Depends(get_firestore_client),
+):
     """
     Log in an existing user by validating their credentials.
     Args:
         email (str): The user's email address.
         password (str): The user's password.
+        firestore_client (AsyncFirestoreClient): The database client.
     Returns:
-        dict: An access token if login is successful.
+        dict: A signed access token carrying the user's role, and its lifetime
+        in seconds, if login is successful.
     """
     collection_name = "users"
-    user = firestore_client.get(collection_name, email)
+    user = await firestore_client.get(collection_name, email)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
     
-    if not pwd_context.verify(password, user["password"]):
+    try:
+        valid, new_hash = await password_hasher.verify(password, user["password"])
+    except HasherBusy:
+        raise _hasher_busy()
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials.")
+    if new_hash is not None:
+        # The bcrypt cost changed since this hash was made.
+        await firestore_client.update(collection_name, email, {"password": new_hash})
     
-    token = f"token-for-{email}"
-    return {"access_token": token, "token_type": "bearer"}
+    token, _ = token_signer.issue(email, user.get("role", "user"))
+    return {"access_token": token, "token_type": "bearer", "expires_in": token_signer.ttl}
 
 
 @router.get("/users")
-def list_users(email: str = Depends(validate_token)):
+async def list_users(
+    limit: int = Query(USERS_PAGE_SIZE, ge=1, le=1000, description="Maximum number of users to return"),
+    cursor: Optional[str] = Query(None, description="ID of the last user of the previous page"),
+    stream: bool = Query(False, description="Stream every user after the cursor as one JSON document"),
+    claims: dict = Depends(get_token_claims),
+    firestore_client: AsyncFirestoreClient = Depends(get_firestore_client),
+):
     """
-    List all users (admin only).
+    List users one page at a time (admin only).
 
     Args:
-        email (str): Extracted email address of the current user.
+        limit (int): The page size.
+        cursor (str): The `next_cursor` of the previous page.
+        stream (bool): Stream all remaining users instead of returning a page.
+        claims (dict): The verified token claims of the current user.
+        firestore_client (AsyncFirestoreClient): The database client.
 
     Returns:
-        dict: A list of all users in the Firestore database.
+        dict: The users of the page, without their passwords, and the cursor
+        of the next page, or None on the last page.
     """
-    print(f"Email after validation: {email}") 
+    log_payload(logger, "Listing users for %s", lambda: claims["sub"])
 
-    
-    user = firestore_client.get("users", email)
-    if not user or user.get("role") != "admin":
+    if claims.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions. Admin role required")
 
-    
-    users = firestore_client.list_all_documents("users")
-    user_list = [{"id": doc.id, "data": doc.to_dict()} for doc in users]
-    return {"users": user_list}
+    if stream:
+        return StreamingResponse(_iter_users_json(firestore_client, cursor), media_type="application/json")
+
+    # One extra document tells whether there is a next page.
+    users = firestore_client.list_all_documents("users", limit + 1, cursor, USER_FIELDS)
+    page = [{"id": doc.id, "data": doc.to_dict()} async for doc in users]
+    next_cursor = page[limit - 1]["id"] if len(page) > limit else None
+    return {"users": page[:limit], "next_cursor": next_cursor}
+
+
+async def _iter_users_json(firestore_client: AsyncFirestoreClient, cursor: Optional[str]) -> AsyncIterator[bytes]:
+    separator = b""
+    yield b'{"users":['
+    while True:
+        count = 0
+        async for doc in firestore_client.list_all_documents("users", USERS_PAGE_SIZE, cursor, USER_FIELDS):
+            yield separator + json.dumps({"id": doc.id, "data": doc.to_dict()}).encode()
+            separator = b","
+            cursor = doc.id
+            count += 1
+        if count < USERS_PAGE_SIZE:
+            break
+    yield b'],"next_cursor":null}'
 
 
 # Step 18: Protection against Denial of Service (DoS) attacks
@@ -109,16 +224,16 @@ def limited_endpoint(user_id: str = Query(..., description="The unique user ID")
 
 
 @router.post("/logout")
-def logout_user(token: str = Depends(validate_token)):
+async def logout_user(token: str = Depends(get_token), claims: dict = Depends(get_token_claims)):
     """
-    Log out the user by invalidating their token.    
+    Log out the user by revoking their token until it expires.    
     Args:
-        token (str): The token of the user.    
+        token (str): The token of the user.
+        claims (dict): The verified token claims.
     Returns:
         dict: A success message.
     """
-    if token in invalidated_tokens:
+    if not await revocation_store.revoke(token, claims["exp"]):
         raise HTTPException(status_code=400, detail="User already logged out.")
-    invalidated_tokens.append(token)
 
     return {"message": "User logged out successfully."}
@@ -1,77 +1,206 @@
 import os
 import json
-import pandas as pd
-from fastapi import APIRouter
-from kaggle.api.kaggle_api_extended import KaggleApi
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-import joblib
-from typing import List
-
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from src.api.http_cache import (
+    cached_response,
+    file_validators,
+    is_not_modified,
+    not_modified,
+    validator_headers,
+)
+from src.api.responses import FastJSONResponse, dumps
+from src.api.dependencies.rate_limit import PREDICT_RATE_LIMIT, TRAIN_RATE_LIMIT, rate_limited
+from src.schemas.prediction import BatchPredictionRequest
+from src.services.batching import MicroBatcher
+from src.services.data import (
+    DATASET_PATH,
+    dataset_store,
+    iter_csv,
+    iter_dataset_chunks,
+    iter_ndjson,
+    read_columns,
+    read_dataset_page,
+)
+from src.services.downloads import DATA_DIR, download_manager
+from src.services.jobs import job_manager
+from src.services.log import get_logger, log_payload
+from src.services.model_registry import model_registry
+from src.services.pipeline import load_model_parameters, preprocess, run_training_job, split
+from src.services.prediction import (
+    columns_to_matrix,
+    decode_matrix,
+    format_predictions,
+    predict_matrix,
+    records_to_matrix,
+)
 
 
 router = APIRouter()
+logger = get_logger("data", sampled=True)
+
+
+PREDICT_ENGINE = os.getenv("PREDICT_ENGINE", "compiled")
+# JSON pages are built in memory, so their size is bounded; ndjson and csv
+# stream any number of rows.
+DATASET_PAGE_SIZE = int(os.getenv("DATASET_PAGE_SIZE", "1000"))
+DATASET_MAX_PAGE_SIZE = int(os.getenv("DATASET_MAX_PAGE_SIZE", "10000"))
+PREDICT_ENGINE_MAX_ROWS = int(os.getenv("PREDICT_ENGINE_MAX_ROWS", "512"))
+
+
+def _predict(matrix, proba=False):
+    loaded = model_registry.get()
+    result = predict_matrix(
+        loaded.model,
+        matrix,
+        proba=proba,
+        engine=loaded.engine if PREDICT_ENGINE == "compiled" else None,
+        engine_max_rows=PREDICT_ENGINE_MAX_ROWS,
+    )
+    return result, loaded.version
+
+
+def _predict_codes(matrix):
+    result, model_version = _predict(matrix)
+    return result["predictions"], model_version
+
+
+predict_batcher = None
+if os.getenv("PREDICT_MICROBATCH", "0") == "1":
+    predict_batcher = MicroBatcher(
+        _predict_codes,
+        max_batch_size=int(os.getenv("PREDICT_MAX_BATCH_SIZE", "256")),
+        max_wait_ms=float(os.getenv("PREDICT_MAX_WAIT_MS", "5")),
+    )
+
 
 # Step 6: Access the dataset
 @router.get("/data/download")
-def download_dataset():
+def download_dataset(
+    force: bool = Query(False, description="Fetch again even if the cached archive is current"),
+    background: bool = Query(False, description="Return at once and download in the background"),
+):
     """
     Downloads the Iris dataset from Kaggle and saves it to src/data.
 
+    The archive is cached and verified by the download manager, so repeated
+    calls do not touch the network while the cached copy is current (see
+    DATASET_VERSION, DATASET_SHA256 and DOWNLOAD_MAX_AGE). With
+    `background`, poll /v1/data/download/{download_id} for its progress.
+
     Returns:
         dict: A message indicating success or error.
     """
-    api = KaggleApi()
-    api.authenticate()
-
-    dataset = "uciml/iris"
-    local_path = "src/data"
-
-    os.makedirs(local_path, exist_ok=True)
-
     try:
-        api.dataset_download_files(dataset, path=local_path, unzip=True)
-        return {"message": f"Dataset downloaded successfully to {local_path}"}
+        if background:
+            task, created = download_manager.start(force=force)
+            message = "Download started." if created else "Download already in progress."
+            return {"message": message, **task.describe()}
+
+        result = download_manager.download(force=force)
+        return {"message": f"Dataset downloaded successfully to {DATA_DIR}", **result}
     except Exception as e:
         return {"error": str(e)}
 
+
+@router.get("/data/download/{download_id}")
+def get_download(download_id: str):
+    """
+    Get the status and progress of a background download.
+
+    Args:
+        download_id (str): The id returned when the download was started.
+
+    Returns:
+        dict: The download status, stage, bytes fetched and result.
+    """
+    task = download_manager.get(download_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Download not found.")
+    return task.describe()
+
 #Step 7: Loading the Iris Flower dataset
 @router.get("/data/load")
-def load_dataset():
+def load_dataset(
+    request: Request,
+    offset: int = Query(0, ge=0, description="Number of rows to skip"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of rows to return"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    format: str = Query("json", regex="^(json|ndjson|csv)$", description="json, ndjson or csv"),
+):
     """
     Loads the Iris dataset as a JSON response.
 
+    Args:
+        offset (int): The number of rows to skip.
+        limit (int): The page size. JSON pages default to DATASET_PAGE_SIZE
+            rows and hold at most DATASET_MAX_PAGE_SIZE; the streaming
+            formats return all remaining rows if not set.
+        columns (str): Comma-separated column names to project.
+        format (str): `json` returns the page as a list of dictionaries, with
+            the offset of the next page in the `X-Next-Offset` header.
+            `ndjson` and `csv` stream the rows chunk by chunk.
+
+    Responses carry an ETag and Last-Modified derived from the dataset file;
+    a client sending them back gets a 304 while the file is unchanged. JSON
+    pages are compressed (gzip, or zstd when available) as negotiated, and
+    the encoded bodies are cached until the file changes.
+
     Returns:
         list: The dataset rows as a list of dictionaries.
     """
-    file_path = "src/data/iris.csv"
+    file_path = DATASET_PATH
     if not os.path.exists(file_path):
         return {"error": "Dataset not found. Please download it first."}
-    
+
     try:
-        df = pd.read_csv(file_path)
-        return df.to_dict(orient="records")
+        etag, last_modified = file_validators(file_path)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(etag, last_modified)
+
+        selected = [name.strip() for name in columns.split(",")] if columns else None
+        if selected:
+            unknown = set(selected) - set(read_columns(file_path))
+            if unknown:
+                return {"error": f"Unknown columns: {', '.join(sorted(unknown))}"}
+
+        if format != "json":
+            chunks = iter_dataset_chunks(file_path, offset, limit, selected)
+            headers = validator_headers(etag, last_modified)
+            if format == "ndjson":
+                return StreamingResponse(iter_ndjson(chunks), media_type="application/x-ndjson", headers=headers)
+            return StreamingResponse(iter_csv(chunks), media_type="text/csv", headers=headers)
+
+        page_size = min(limit or DATASET_PAGE_SIZE, DATASET_MAX_PAGE_SIZE)
+
+        def render():
+            df = read_dataset_page(file_path, offset, page_size + 1, selected)
+            headers = {}
+            if len(df) > page_size:
+                df = df.iloc[:page_size]
+                headers["X-Next-Offset"] = str(offset + page_size)
+            return dumps(df), headers
+
+        key = ("data/load", file_path, offset, page_size, tuple(selected or ()))
+        return cached_response(request, key, etag, render, last_modified)
     except Exception as e:
         return {"error": str(e)}
-    
+
 
 # Step 8: Processing the Dataset
 @router.get("/data/preprocess")
 def preprocess_dataset():
     """
     Preprocess the dataset by encoding categorical variables
-    and saving the processed data to src/data/iris_processed.csv.
+    and saving the processed data to the dataset store (src/data/store).
     """
-    file_path = "src/data/iris.csv"
-    processed_path = "src/data/iris_processed.csv"
-    
-    if not os.path.exists(file_path):
+    if not os.path.exists(DATASET_PATH):
         return {"error": "Dataset not found. Please download it first."}
-    
+
     try:
-        df = pd.read_csv(file_path)
-        df['Species'] = df['Species'].astype('category').cat.codes
-        df.to_csv(processed_path, index=False)
+        processed_path = preprocess(DATASET_PATH)
         return {"message": f"Dataset preprocessed and saved to {processed_path}"}
     except Exception as e:
         return {"error": str(e)}
@@ -82,94 +211,134 @@ def preprocess_dataset():
 def split_dataset():
     """
     Split the preprocessed dataset into training and testing sets.
-    Save the splits to src/data/train.csv and src/data/test.csv.
+    Save the splits (train, test, y_train, y_test) to the dataset store.
     """
-    processed_path = "src/data/iris_processed.csv"
-    if not os.path.exists(processed_path):
+    if not dataset_store.exists("iris_processed"):
         return {"error": "Processed dataset not found. Please preprocess it first."}
-    
+
     try:
-        df = pd.read_csv(processed_path)
-
-        if 'Id' in df.columns:
-            df = df.drop(columns=['Id'])
-        
-        X = df.drop(columns=["Species"])
-        y = df["Species"]
-
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-        X_train.to_csv("src/data/train.csv", index=False)
-        X_test.to_csv("src/data/test.csv", index=False)
-        y_train.to_csv("src/data/y_train.csv", index=False)
-        y_test.to_csv("src/data/y_test.csv", index=False)
-        
-        return {"message": "Dataset split successfully and saved in src/data directory."}
+        split()
+        return {"message": f"Dataset split successfully and saved in {dataset_store.directory}."}
     except Exception as e:
         return {"error": str(e)}
 
 # Step 11: Train the Classification Model 
-@router.post("/model/train")
+@router.post("/model/train", dependencies=[Depends(rate_limited("train", *TRAIN_RATE_LIMIT))])
 def train_model():
     """
     Train a classification model using the preprocessed dataset.
     Save the trained model to src/models.
+
+    Training runs as a background job on a process pool; poll
+    /v1/jobs/{job_id} for its status. Submitting while an identical
+    training (same parameters) is running returns the running job.
+
+    Returns:
+        dict: The job id and status.
     """
     try:
-        train_path = "src/data/train.csv"
-        y_train_path = "src/data/y_train.csv"
-        params_path = "src/config/model_parameters.json"
-        model_path = "src/models/random_forest_model.pkl"
-
-        if not os.path.exists(train_path) or not os.path.exists(y_train_path):
+        if not dataset_store.exists("train") or not dataset_store.exists("y_train"):
             return {"error": "Training data not found. Please split the dataset first."}
 
-        X_train = pd.read_csv(train_path)
-        y_train = pd.read_csv(y_train_path).squeeze()  
+        params = load_model_parameters()
+        job, created = job_manager.submit(
+            "train",
+            run_training_job,
+            params,
+            key="train:" + json.dumps(params, sort_keys=True),
+            on_success=lambda _: model_registry.refresh(),
+        )
 
-        with open(params_path, "r") as f:
-            params = json.load(f)
+        message = "Training job submitted." if created else "Identical training job already running."
+        return {"message": message, **job.describe()}
+    except Exception as e:
+        return {"error": str(e)}
 
-        model = RandomForestClassifier(**params)
-        model.fit(X_train, y_train)
+# Step 12: Prediction with Trained Model
+def _predict_records(data: List[dict]):
+    log_payload(logger, "Prediction input: %s", lambda: data)
 
-        os.makedirs("src/models", exist_ok=True)
-        joblib.dump(model, model_path)
+    predictions, model_version = _predict_codes(records_to_matrix(data))
+    logger.debug(
+        "Predicted %d rows with model %s", len(predictions), model_version,
+        extra={"fields": {"rows": len(predictions), "model_version": model_version}},
+    )
+
+    return predictions, model_version
 
-        return {"message": f"Model trained and saved at {model_path}"}
-    except Exception as e:
-        return {"error": str(e)}
 
- # Step 12: Prediction with Trained Model
-@router.post("/model/predict")
-def predict(data: List[dict]):
+@router.post("/model/predict", dependencies=[Depends(rate_limited("predict", *PREDICT_RATE_LIMIT))])
+async def predict(data: List[dict]):
     """
     Make predictions using the trained model.
     Input: JSON data as a list of validated features.
     Output: Predictions as JSON.
+
+    When PREDICT_MICROBATCH=1, concurrent calls are coalesced into a single
+    vectorized prediction (see PREDICT_MAX_BATCH_SIZE and PREDICT_MAX_WAIT_MS).
     """
     try:
-        model_path = "src/models/random_forest_model.pkl"
-        if not os.path.exists(model_path):
+        if not os.path.exists(model_registry.path):
             return {"error": "Trained model not found. Please train the model first."}
 
-        model = joblib.load(model_path)
+        if predict_batcher is not None:
+            predictions, model_version = await predict_batcher.submit(records_to_matrix(data))
+        else:
+            predictions, model_version = await run_in_threadpool(_predict_records, data)
+
+        formatted_predictions = format_predictions(predictions)
+
+        return FastJSONResponse({"predictions": formatted_predictions, "model_version": model_version})
+
+    except Exception as e:
+        logger.warning("Prediction failed: %s", e)
+        return {"error": str(e)}
+
+
+@router.get("/model/predict/stats")
+def predict_stats():
+    """
+    Report the prediction micro-batcher's queue depth and batch-size histogram.
+
+    Returns:
+        dict: The scheduler statistics, or whether micro-batching is disabled.
+    """
+    if predict_batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **predict_batcher.stats()}
+
+
+@router.post("/model/predict/batch", dependencies=[Depends(rate_limited("predict", *PREDICT_RATE_LIMIT))])
+def predict_batch(request: BatchPredictionRequest):
+    """
+    Make vectorized predictions over a columnar batch.
+
+    Args:
+        request (BatchPredictionRequest): Either one array per feature column
+            or a base64 packed float32 matrix, and whether to return probabilities.
+
+    Returns:
+        dict: Class codes, species labels, optional probabilities and the model version.
+    """
+    try:
+        if not os.path.exists(model_registry.path):
+            return {"error": "Trained model not found. Please train the model first."}
 
-        X_input = pd.DataFrame(data)
-        print("Input DataFrame:\n", X_input)
+        if request.columns is not None:
+            matrix = columns_to_matrix(request.columns)
+        else:
+            matrix = decode_matrix(request.matrix)
 
-        predictions = model.predict(X_input)
-        print("Predictions:", predictions)
-        print("Type of predictions:", type(predictions))
-        if hasattr(predictions, "dtype"):
-            print("Dtype of predictions:", predictions.dtype)
+        result, model_version = _predict(matrix, proba=request.proba)
 
-        reverse_species_mapping = {0: "Iris-setosa", 1: "Iris-versicolor", 2: "Iris-virginica"}
-        formatted_predictions = [
-            f"{pred} ({reverse_species_mapping[pred]})" for pred in predictions
-        ]
-        
-        return {"predictions": formatted_predictions}
-    
+        response = {
+            "predictions": result["predictions"],
+            "labels": result["labels"],
+            "model_version": model_version,
+        }
+        if request.proba:
+            response["probabilities"] = result["probabilities"]
+        return FastJSONResponse(response)
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        logger.warning("Batch prediction failed: %s", e)
+        return {"error": str(e)}
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from src.services.jobs import job_manager
+
+router = APIRouter()
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """
+    Get the status of a background job.
+
+    Args:
+        job_id (str): The id returned when the job was submitted.
+
+    Returns:
+        dict: The job id, kind, status and timestamps.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job.describe()
+
+
+@router.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    """
+    Get the result of a finished background job.
+
+    Args:
+        job_id (str): The id returned when the job was submitted.
+
+    Returns:
+        dict: The job summary and its result; 202 while the job is not finished.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+
+    summary = job.describe()
+    if summary["status"] in ("queued", "running"):
+        return JSONResponse(status_code=202, content=summary)
+    if summary["status"] == "failed":
+        return summary
+    return {**summary, "result": job.future.result()}
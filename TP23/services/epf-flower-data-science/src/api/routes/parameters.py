@@ -1,17 +1,18 @@
-from fastapi import APIRouter, HTTPException
-from firestore import FirestoreClient
+from fastapi import APIRouter, Depends, HTTPException, Request
+from firestore import AsyncFirestoreClient
+from src.api.dependencies.database import get_firestore_client
+from src.api.http_cache import cached_response, content_etag
+from src.api.responses import dumps
+from src.services import parameters as parameters_service
 
 router = APIRouter()
-firestore_client = FirestoreClient()
 
 # Step 13: Create Firestore Collection
 @router.post("/firestore/create")
-def create_parameters():
+async def create_parameters(firestore_client: AsyncFirestoreClient = Depends(get_firestore_client)):
     """Create default parameters in Firestore."""
     try:
-        firestore_client.create(
-            "parameters", "parameters", {"n_estimators": 100, "criterion": "gini"}
-        )
+        await parameters_service.create_parameters(firestore_client)
         return {"message": "Parameters document created successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -19,11 +20,12 @@ def create_parameters():
 
 # Step 14: Retrieve Firestore Parameters
 @router.get("/firestore/retrieve")
-def retrieve_parameters():
-    """Retrieve parameters document."""
+async def retrieve_parameters(request: Request, firestore_client: AsyncFirestoreClient = Depends(get_firestore_client)):
+    """Retrieve parameters document, with an ETag for conditional requests."""
     try:
-        data = firestore_client.get("parameters", "parameters")
-        return data
+        data = await parameters_service.retrieve_parameters(firestore_client)
+        body = dumps(data)
+        return cached_response(request, "firestore/retrieve", content_etag(body), lambda: (body, {}))
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -32,10 +34,10 @@ def retrieve_parameters():
 
 # Step 15: Update Firestore Parameters
 @router.put("/firestore/update")
-def update_parameters(params: dict):
+async def update_parameters(params: dict, firestore_client: AsyncFirestoreClient = Depends(get_firestore_client)):
     """Update parameters in Firestore."""
     try:
-        firestore_client.update("parameters", "parameters", params)
+        await parameters_service.update_parameters(firestore_client, params)
         return {"message": "Parameters updated successfully."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from src.services.pipeline import run_pipeline
+
+router = APIRouter()
+
+
+@router.post("/pipeline/run")
+def run_training_pipeline(force: bool = False):
+    """
+    Run preprocess -> split -> train, executing only the stale steps.
+
+    Args:
+        force (bool): Rerun every step even if its inputs are unchanged.
+
+    Returns:
+        dict: The status ("cached" or "ran") and duration of each step,
+        and the number of cache hits.
+    """
+    try:
+        return run_pipeline(force=force)
+    except FileNotFoundError as e:
+        return {"error": f"Missing pipeline input: {e.filename}"}
+    except Exception as e:
+        return {"error": str(e)}
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from firestore import AsyncFirestoreClient
+from src.api.dependencies.database import get_firestore_client
+from src.api.dependencies.rate_limit import TUNE_RATE_LIMIT, rate_limited
+from src.schemas.tuning import TuningRequest
+from src.services.data import dataset_store
+from src.services.parameters import update_parameters
+from src.services.tuning import tune
+
+router = APIRouter()
+
+
+@router.post("/model/tune", dependencies=[Depends(rate_limited("tune", *TUNE_RATE_LIMIT))])
+async def tune_model(
+    request: TuningRequest = TuningRequest(),
+    firestore_client: AsyncFirestoreClient = Depends(get_firestore_client),
+):
+    """
+    Search RandomForest parameters with cross-validation on the training split.
+
+    Candidate fits are spread over all cores. The best parameters are written
+    to the Firestore parameters document unless `write_back` is false.
+
+    Args:
+        request (TuningRequest): The parameter grid, search mode ("grid" or
+            "random"), number of random candidates, folds and pruning tolerance.
+        firestore_client (AsyncFirestoreClient): The database client.
+
+    Returns:
+        dict: The best parameters and score, and every candidate's outcome.
+    """
+    if not dataset_store.exists("train") or not dataset_store.exists("y_train"):
+        return {"error": "Training data not found. Please split the dataset first."}
+
+    try:
+        result = await run_in_threadpool(
+            tune,
+            param_grid=request.param_grid,
+            search=request.search,
+            n_iter=request.n_iter,
+            cv=request.cv,
+            tolerance=request.tolerance,
+        )
+    except Exception as e:
+        return {"error": str(e)}
+
+    if request.write_back:
+        try:
+            await update_parameters(firestore_client, result["best_params"])
+            result["written_back"] = True
+        except Exception as e:
+            result["written_back"] = False
+            result["write_back_error"] = str(e)
+    return result
@@ -3,7 +3,17 @@ from fastapi.responses import JSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
+from src.api.dependencies.database import close_firestore_client
+from src.api.middleware import MetricsMiddleware
+from src.api.responses import FastJSONResponse
+from src.api.routes import metrics as metrics_routes
 from src.api.router import router_v1
+from src.services.jobs import job_manager
+from src.services.log import configure_logging
+from src.services.metrics import metrics
+from src.services.passwords import password_hasher
+from src.services.tuning import shutdown as shutdown_tuning_pool
+from src.services.warmup import APP_WARMUP, start_warm_up
 
 
 app = FastAPI()
@@ -34,11 +44,14 @@ async def custom_404_handler(request: Request, exc: StarletteHTTPException):
     )
 
 def get_application() -> FastAPI:
+    configure_logging()
+
     application = FastAPI(
         title="epf-flower-data-science",
         description="""Fast API""",
         version="1.0.0",
         redoc_url=None,
+        default_response_class=FastJSONResponse,
     )
 
     application.add_middleware(
@@ -49,7 +62,17 @@ def get_application() -> FastAPI:
         allow_headers=["*"],
     )
 
+    if metrics.enabled:
+        application.add_middleware(MetricsMiddleware, metrics=metrics)
+        application.include_router(metrics_routes.router, tags=["Metrics"])
+
     application.include_router(router_v1)
+    application.add_event_handler("shutdown", job_manager.shutdown)
+    application.add_event_handler("shutdown", close_firestore_client)
+    application.add_event_handler("shutdown", password_hasher.shutdown)
+    application.add_event_handler("shutdown", shutdown_tuning_pool)
+    if APP_WARMUP:
+        application.add_event_handler("startup", start_warm_up)
     return application
 
 
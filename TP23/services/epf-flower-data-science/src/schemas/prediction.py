@@ -0,0 +1,23 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel, root_validator
+
+
+class BatchPredictionRequest(BaseModel):
+    """
+    Columnar prediction input.
+
+    Exactly one of `columns` (one array per iris feature) or `matrix`
+    (base64 of a row-major little-endian float32 matrix with the four
+    feature columns) must be given.
+    """
+
+    columns: Optional[Dict[str, List[float]]] = None
+    matrix: Optional[str] = None
+    proba: bool = False
+
+    @root_validator(skip_on_failure=True)
+    def check_single_input(cls, values):
+        if (values.get("columns") is None) == (values.get("matrix") is None):
+            raise ValueError("Provide exactly one of 'columns' or 'matrix'.")
+        return values
+
@@ -0,0 +1,11 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+class TuningRequest(BaseModel):
+    param_grid: Optional[Dict[str, List[Any]]] = None
+    search: str = Field("grid", regex="^(grid|random)$")
+    n_iter: int = Field(10, ge=1)
+    cv: int = Field(5, ge=2)
+    tolerance: float = Field(0.05, ge=0)
+    write_back: bool = True
@@ -1,7 +1,16 @@
-from pydantic import BaseModel, EmailStr
+from typing import List
+from pydantic import BaseModel, EmailStr, Field
 
 class User(BaseModel):
     email: EmailStr
     password: str
     name: str
     role: str = "user"  # "user" ou "admin"
+
+
+class BatchUser(User):
+    role: str = Field("user", regex="^(user|admin)$")
+
+
+class UserBatch(BaseModel):
+    users: List[BatchUser] = Field(..., min_items=1, max_items=10_000)
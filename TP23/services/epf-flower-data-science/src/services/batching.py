@@ -0,0 +1,165 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class _PendingRequest:
+    __slots__ = ("matrix", "future")
+
+    def __init__(self, matrix: np.ndarray, future: asyncio.Future) -> None:
+        self.matrix = matrix
+        self.future = future
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent prediction calls into a single vectorized call.
+
+    Requests are queued and a background task groups them until either
+    `max_batch_size` rows are collected or `max_wait_ms` has elapsed since the
+    first queued request. The grouped matrix goes through `predict_fn` once
+    and every caller receives the slice of the result matching its rows.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], Tuple[np.ndarray, Any]],
+        max_batch_size: int = 256,
+        max_wait_ms: float = 5.0,
+    ) -> None:
+        """
+        Args:
+            predict_fn: Blocking function returning one result per input row
+                and metadata shared by the whole batch (e.g. the model version).
+            max_batch_size (int): Maximum number of rows per coalesced call.
+            max_wait_ms (float): Maximum time the first request waits for others.
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self._bucket_bounds = _batch_buckets(max_batch_size)
+        self._bucket_counts = [0] * (len(self._bucket_bounds) + 1)
+        self.batches = 0
+        self.rows = 0
+        self.requests = 0
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def submit(self, matrix: np.ndarray) -> Tuple[np.ndarray, Any]:
+        """
+        Queue a feature matrix and wait for its share of a coalesced prediction.
+
+        Args:
+            matrix (np.ndarray): The caller's (n_rows, n_features) matrix.
+
+        Returns:
+            tuple: The caller's rows of the result and the batch metadata.
+        """
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait(_PendingRequest(matrix, future))
+        return await future
+
+    async def _collect(self) -> List[_PendingRequest]:
+        queue = self._queue
+        batch = [await queue.get()]
+        rows = len(batch[0].matrix)
+        deadline = self._loop.time() + self.max_wait
+
+        while rows < self.max_batch_size:
+            if queue.empty():
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                pending = queue.get_nowait()
+            batch.append(pending)
+            rows += len(pending.matrix)
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            batch = [pending for pending in batch if not pending.future.done()]
+            if not batch:
+                continue
+
+            if len(batch) == 1:
+                matrix = batch[0].matrix
+            else:
+                matrix = np.concatenate([pending.matrix for pending in batch])
+            self._record(len(batch), len(matrix))
+
+            try:
+                result, meta = await self._loop.run_in_executor(None, self.predict_fn, matrix)
+            except Exception as e:
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                continue
+
+            start = 0
+            for pending in batch:
+                end = start + len(pending.matrix)
+                if not pending.future.done():
+                    pending.future.set_result((result[start:end], meta))
+                start = end
+
+    def _record(self, n_requests: int, n_rows: int) -> None:
+        self.batches += 1
+        self.requests += n_requests
+        self.rows += n_rows
+        index = 0
+        while index < len(self._bucket_bounds) and n_rows > self._bucket_bounds[index]:
+            index += 1
+        self._bucket_counts[index] += 1
+
+    def queue_depth(self) -> int:
+        """Number of requests waiting to be batched."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the scheduler's counters.
+
+        Returns:
+            dict: Queue depth, totals and a cumulative batch-size histogram
+            (rows per coalesced call, keyed by upper bound).
+        """
+        histogram = {}
+        cumulative = 0
+        for bound, count in zip(self._bucket_bounds, self._bucket_counts):
+            cumulative += count
+            histogram[str(bound)] = cumulative
+        histogram["+Inf"] = cumulative + self._bucket_counts[-1]
+        return {
+            "queue_depth": self.queue_depth(),
+            "batches": self.batches,
+            "requests": self.requests,
+            "rows": self.rows,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batch_size_histogram": histogram,
+        }
+
+
+def _batch_buckets(max_batch_size: int) -> List[int]:
+    bounds = [1]
+    while bounds[-1] < max_batch_size:
+        bounds.append(bounds[-1] * 2)
+    return bounds
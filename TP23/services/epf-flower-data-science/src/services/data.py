@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterator, List, Optional
+
+import numpy as np
+
+from src.services.metrics import metrics
+from src.services.utils import atomic_write_bytes, file_digest, remember_digest
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DATASET_PATH = "src/data/iris.csv"
+DATASET_CHUNK_SIZE = 10_000
+STORE_DIR = "src/data/store"
+
+
+def read_columns(path: str) -> List[str]:
+    """
+    Read the header of a CSV file.
+
+    Args:
+        path (str): The path of the CSV file.
+
+    Returns:
+        list: The column names.
+    """
+    import pandas as pd
+
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def iter_dataset_chunks(
+    path: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+    chunk_size: int = DATASET_CHUNK_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a window of a CSV file as a sequence of bounded-size frames.
+
+    Only `chunk_size` rows are held in memory at a time, whatever the size
+    of the file.
+
+    Args:
+        path (str): The path of the CSV file.
+        offset (int): The number of data rows to skip.
+        limit (int): The maximum number of rows to return, or None for all.
+        columns (list): The columns to keep, or None for all.
+        chunk_size (int): The number of rows parsed at a time.
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of the requested window.
+    """
+    import pandas as pd
+
+    remaining = limit
+    with pd.read_csv(path, usecols=columns, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            if offset >= len(chunk):
+                offset -= len(chunk)
+                continue
+            if offset:
+                chunk = chunk.iloc[offset:]
+                offset = 0
+            if remaining is not None:
+                chunk = chunk.iloc[:remaining]
+                remaining -= len(chunk)
+            if len(chunk):
+                if columns:
+                    chunk = chunk[columns]
+                yield chunk
+            if remaining == 0:
+                return
+
+
+def read_dataset_page(
+    path: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Read one page of a CSV file.
+
+    Args:
+        path (str): The path of the CSV file.
+        offset (int): The number of data rows to skip.
+        limit (int): The page size, or None for the rest of the file.
+        columns (list): The columns to keep, or None for all.
+
+    Returns:
+        pd.DataFrame: The rows of the page.
+    """
+    import pandas as pd
+
+    with metrics.span("csv_parse"):
+        chunks = list(iter_dataset_chunks(path, offset, limit, columns))
+    if not chunks:
+        return pd.DataFrame(columns=columns or read_columns(path))
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+
+def iter_ndjson(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    """
+    Encode frames as newline-delimited JSON, one record per line.
+
+    Args:
+        chunks (iterator): The frames to encode.
+
+    Yields:
+        bytes: The encoded chunks.
+    """
+    for chunk in chunks:
+        yield chunk.to_json(orient="records", lines=True).rstrip("\n").encode() + b"\n"
+
+
+def iter_csv(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    """
+    Encode frames as CSV, with the header written once.
+
+    Args:
+        chunks (iterator): The frames to encode.
+
+    Yields:
+        bytes: The encoded chunks.
+    """
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode()
+        header = False
+
+
+class DatasetStore:
+    """
+    Binary store for the frames handed from one pipeline step to the next.
+
+    Frames are saved as NumPy structured arrays (`.npy`), which load in one
+    read without any text parsing; building the frame copies each column
+    out of the record array, once per file content. Decoded frames are kept
+    in a bounded in-process LRU keyed by the SHA-256 of the file, so a step
+    reading what the previous step just wrote does not touch the disk.
+    """
+
+    def __init__(self, directory: str = STORE_DIR, max_entries: int = 16) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        self._frames: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, name: str) -> str:
+        """Return the file backing a named frame."""
+        return os.path.join(self.directory, f"{name}.npy")
+
+    def exists(self, name: str) -> bool:
+        """Whether a named frame has been saved."""
+        return os.path.exists(self.path(name))
+
+    def digest(self, name: str) -> str:
+        """
+        Return the content hash of a named frame.
+
+        Args:
+            name (str): The frame name.
+
+        Returns:
+            str: The SHA-256 of the backing file.
+        """
+        return file_digest(self.path(name))
+
+    def save(self, name: str, frame: pd.DataFrame) -> str:
+        """
+        Persist a frame atomically and keep it in the cache.
+
+        Args:
+            name (str): The frame name.
+            frame (pd.DataFrame): The frame to save.
+
+        Returns:
+            str: The content hash of the saved file.
+        """
+        buffer = io.BytesIO()
+        np.save(buffer, _to_records(frame), allow_pickle=False)
+        payload = buffer.getvalue()
+        path = self.path(name)
+        atomic_write_bytes(path, payload)
+
+        digest = hashlib.sha256(payload).hexdigest()
+        remember_digest(path, digest)
+        with self._lock:
+            self._remember(digest, frame.reset_index(drop=True))
+        return digest
+
+    def load(self, name: str) -> pd.DataFrame:
+        """
+        Load a named frame, from the cache when its content is unchanged.
+
+        The returned frame is shared with other readers and must not be
+        modified in place.
+
+        Args:
+            name (str): The frame name.
+
+        Returns:
+            pd.DataFrame: The frame.
+
+        Raises:
+            FileNotFoundError: If the frame has not been saved.
+        """
+        digest = self.digest(name)
+        with self._lock:
+            frame = self._frames.get(digest)
+            if frame is not None:
+                self._frames.move_to_end(digest)
+                self.hits += 1
+                return frame
+            self.misses += 1
+
+        import pandas as pd
+
+        records = np.load(self.path(name), allow_pickle=False)
+        frame = pd.DataFrame({column: records[column] for column in records.dtype.names})
+        with self._lock:
+            self._remember(digest, frame)
+        return frame
+
+    def _remember(self, digest: str, frame: pd.DataFrame) -> None:
+        self._frames[digest] = frame
+        self._frames.move_to_end(digest)
+        while len(self._frames) > self.max_entries:
+            self._frames.popitem(last=False)
+
+
+def _to_records(frame: pd.DataFrame) -> np.ndarray:
+    arrays = []
+    for column in frame.columns:
+        values = frame[column].to_numpy()
+        if values.dtype == object:
+            values = values.astype(str)
+        arrays.append(values)
+    return np.rec.fromarrays(arrays, names=[str(column) for column in frame.columns])
+
+
+dataset_store = DatasetStore()
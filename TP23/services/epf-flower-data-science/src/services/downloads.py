@@ -0,0 +1,388 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.services.log import get_logger
+from src.services.utils import atomic_write_bytes, file_digest, file_sha256
+
+KAGGLE_DATASET = "uciml/iris"
+DATASET_VERSION = os.getenv("DATASET_VERSION", "latest")
+DATASET_SHA256 = os.getenv("DATASET_SHA256") or None
+# A local archive to use instead of Kaggle, e.g. in tests or offline.
+DATASET_ARCHIVE = os.getenv("DATASET_ARCHIVE") or None
+DOWNLOAD_CACHE_DIR = os.getenv("DOWNLOAD_CACHE_DIR", "src/data/cache")
+# How long a "latest" archive is trusted before Kaggle is asked again.
+DOWNLOAD_MAX_AGE = float(os.getenv("DOWNLOAD_MAX_AGE", "86400"))
+DATA_DIR = "src/data"
+
+# Archive member -> file name in the data directory. The Kaggle archive also
+# holds a database.sqlite, which is not needed and is not extracted.
+IRIS_FILES = {"Iris.csv": "iris.csv"}
+
+Progress = Callable[[int, Optional[int]], None]
+logger = get_logger("downloads")
+
+
+class ChecksumMismatch(Exception):
+    """Raised when a downloaded or cached archive does not have the expected SHA-256."""
+
+
+def _no_progress(done: int, total: Optional[int]) -> None:
+    pass
+
+
+class KaggleSource:
+    """Fetch dataset archives from Kaggle."""
+
+    def fetch(self, slug: str, version: str, destination: str, progress: Progress) -> None:
+        """
+        Download a dataset archive.
+
+        Args:
+            slug (str): The dataset, as "owner/name".
+            version (str): A version number, or "latest".
+            destination (str): Where to write the zip archive.
+            progress (callable): Called with the bytes done and the total.
+        """
+        # Imported here: kaggle is slow to import and checks credentials on import.
+        from kaggle.api.kaggle_api_extended import KaggleApi
+
+        api = KaggleApi()
+        api.authenticate()
+        dataset = slug if version == "latest" else f"{slug}/versions/{version}"
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(destination)) as directory:
+            api.dataset_download_files(dataset, path=directory, force=True, quiet=True)
+            archive = os.path.join(directory, slug.split("/")[-1] + ".zip")
+            size = os.path.getsize(archive)
+            os.replace(archive, destination)
+        progress(size, size)
+
+
+class LocalArchiveSource:
+    """
+    Copy a dataset archive from a local file, as a stand-in for Kaggle.
+
+    The copy goes through a `.part` file and resumes where an interrupted
+    copy stopped.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 1 << 20) -> None:
+        self.path = path
+        self.chunk_size = chunk_size
+
+    def fetch(self, slug: str, version: str, destination: str, progress: Progress) -> None:
+        """
+        Copy the archive, whatever the dataset and version asked for.
+
+        Args:
+            slug (str): The dataset, as "owner/name".
+            version (str): A version number, or "latest".
+            destination (str): Where to write the zip archive.
+            progress (callable): Called with the bytes done and the total.
+        """
+        part = destination + ".part"
+        done = os.path.getsize(part) if os.path.exists(part) else 0
+        total = os.path.getsize(self.path)
+        if done > total:
+            done = 0
+            os.remove(part)
+        with open(self.path, "rb") as source, open(part, "ab") as target:
+            source.seek(done)
+            for chunk in iter(lambda: source.read(self.chunk_size), b""):
+                target.write(chunk)
+                done += len(chunk)
+                progress(done, total)
+        os.replace(part, destination)
+
+
+def create_source(archive: Optional[str] = DATASET_ARCHIVE):
+    """
+    Build the archive source.
+
+    Args:
+        archive (str): A local archive to use instead of Kaggle.
+
+    Returns:
+        The source.
+    """
+    return LocalArchiveSource(archive) if archive else KaggleSource()
+
+
+def _extract(archive: str, files: Dict[str, str], destination: str) -> None:
+    """Extract some members, replacing each target file in one rename."""
+    os.makedirs(destination, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=destination, prefix=".extract-")
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            names = set(zf.namelist())
+            missing = set(files) - names
+            if missing:
+                raise FileNotFoundError(f"Not in the archive: {', '.join(sorted(missing))}")
+            for member, target in files.items():
+                staged = os.path.join(staging, target)
+                with zf.open(member) as source, open(staged, "wb") as f:
+                    shutil.copyfileobj(source, f)
+        for target in files.values():
+            os.replace(os.path.join(staging, target), os.path.join(destination, target))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+class DownloadTask:
+    """A background download and its progress."""
+
+    def __init__(self, key: Tuple[str, str]) -> None:
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.stage = "queued"
+        self.bytes_done = 0
+        self.bytes_total: Optional[int] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        """One of "queued", "running", "succeeded" or "failed"."""
+        if self.error is not None:
+            return "failed"
+        if self.result is not None:
+            return "succeeded"
+        return "queued" if self.stage == "queued" else "running"
+
+    def progress(self, done: int, total: Optional[int]) -> None:
+        self.bytes_done = done
+        self.bytes_total = total
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Summarize the download.
+
+        Returns:
+            dict: Id, dataset, status, stage, bytes, timestamps, and the
+            result or error once finished.
+        """
+        summary = {
+            "download_id": self.id,
+            "dataset": self.key[0],
+            "version": self.key[1],
+            "status": self.status,
+            "stage": self.stage,
+            "bytes_done": self.bytes_done,
+            "bytes_total": self.bytes_total,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at,
+        }
+        if self.result is not None:
+            summary["result"] = self.result
+        if self.error is not None:
+            summary["error"] = self.error
+        return summary
+
+
+class DownloadManager:
+    """
+    Download dataset archives once, verify them and extract them atomically.
+
+    Archives are cached under `cache_dir/<owner>/<name>/<version>/` with a
+    manifest of their SHA-256 and fetch time. A pinned version is never
+    fetched twice; "latest" is fetched again once older than `max_age`.
+    Cached archives are re-verified against the manifest before use, and
+    extraction is skipped when the data files already match the archive.
+    """
+
+    def __init__(
+        self,
+        source=None,
+        cache_dir: str = DOWNLOAD_CACHE_DIR,
+        max_age: float = DOWNLOAD_MAX_AGE,
+        max_finished: int = 20,
+    ) -> None:
+        self.source = source or create_source()
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.max_finished = max_finished
+        self._tasks: "OrderedDict[str, DownloadTask]" = OrderedDict()
+        self._active: Dict[Tuple[str, str], DownloadTask] = {}
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+
+    def _paths(self, slug: str, version: str) -> Tuple[str, str]:
+        directory = os.path.join(self.cache_dir, *slug.split("/"), version)
+        return os.path.join(directory, "archive.zip"), os.path.join(directory, "manifest.json")
+
+    def _read_manifest(self, slug: str, version: str) -> Optional[dict]:
+        _, manifest_path = self._paths(slug, version)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    def _cached_manifest(self, slug: str, version: str) -> Optional[dict]:
+        archive, _ = self._paths(slug, version)
+        manifest = self._read_manifest(slug, version)
+        if manifest is None or not os.path.exists(archive):
+            return None
+        if version == "latest" and time.time() - manifest["fetched_at"] > self.max_age:
+            return None
+        if file_digest(archive) != manifest["sha256"]:
+            logger.warning("Cached archive %s is corrupted, fetching it again", archive)
+            return None
+        return manifest
+
+    def _fetch(self, slug: str, version: str, expected_sha256: Optional[str], progress: Progress) -> dict:
+        archive, manifest_path = self._paths(slug, version)
+        os.makedirs(os.path.dirname(archive), exist_ok=True)
+        self.source.fetch(slug, version, archive, progress)
+
+        sha256 = file_sha256(archive)
+        if expected_sha256 and sha256 != expected_sha256:
+            os.remove(archive)
+            raise ChecksumMismatch(f"{slug} archive has SHA-256 {sha256}, expected {expected_sha256}.")
+        with zipfile.ZipFile(archive) as zf:
+            corrupted = zf.testzip()
+        if corrupted is not None:
+            os.remove(archive)
+            raise ChecksumMismatch(f"{slug} archive member {corrupted} fails its CRC check.")
+
+        manifest = {"slug": slug, "version": version, "sha256": sha256, "fetched_at": time.time()}
+        previous = self._read_manifest(slug, version)
+        if previous is not None and previous["sha256"] == sha256 and "files" in previous:
+            # Same archive as before: the extracted files are still current.
+            manifest["files"] = previous["files"]
+        atomic_write_bytes(manifest_path, json.dumps(manifest).encode())
+        return manifest
+
+    def download(
+        self,
+        slug: str = KAGGLE_DATASET,
+        version: str = DATASET_VERSION,
+        destination: str = DATA_DIR,
+        files: Optional[Dict[str, str]] = None,
+        expected_sha256: Optional[str] = DATASET_SHA256,
+        force: bool = False,
+        progress: Optional[Progress] = None,
+        on_stage: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Make the dataset files available in `destination`.
+
+        Args:
+            slug (str): The dataset, as "owner/name".
+            version (str): A version number, or "latest".
+            destination (str): The data directory.
+            files (dict): Archive members to extract, mapped to their file
+                names in `destination`; defaults to the iris CSV.
+            expected_sha256 (str): The archive's SHA-256, if pinned.
+            force (bool): Whether to fetch even if a cached copy is current.
+            progress (callable): Called with the bytes fetched and the total.
+            on_stage (callable): Called with each stage name.
+
+        Returns:
+            dict: The dataset, version, archive SHA-256, extracted files, and
+            whether the archive came from the cache and files were replaced.
+
+        Raises:
+            ChecksumMismatch: If the archive is not the expected one.
+        """
+        files = files or IRIS_FILES
+        stage = on_stage or (lambda name: None)
+        # One fetch at a time: concurrent calls wait and then hit the cache.
+        with self._fetch_lock:
+            stage("checking cache")
+            manifest = None if force else self._cached_manifest(slug, version)
+            cached = manifest is not None
+            if expected_sha256 and cached and manifest["sha256"] != expected_sha256:
+                manifest, cached = None, False
+            if not cached:
+                stage("downloading")
+                manifest = self._fetch(slug, version, expected_sha256, progress or _no_progress)
+
+            stage("extracting")
+            archive, _ = self._paths(slug, version)
+            current = self._file_digests(files, destination)
+            extracted = current is None or manifest.get("files") != current
+            if extracted:
+                _extract(archive, files, destination)
+                manifest["files"] = self._file_digests(files, destination)
+                atomic_write_bytes(self._paths(slug, version)[1], json.dumps(manifest).encode())
+
+        logger.info("Dataset %s@%s ready (cached=%s, extracted=%s)", slug, version, cached, extracted)
+        return {
+            "dataset": slug,
+            "version": version,
+            "sha256": manifest["sha256"],
+            "files": [os.path.join(destination, name) for name in files.values()],
+            "cached": cached,
+            "extracted": extracted,
+        }
+
+    @staticmethod
+    def _file_digests(files: Dict[str, str], destination: str) -> Optional[Dict[str, str]]:
+        digests = {}
+        for name in files.values():
+            path = os.path.join(destination, name)
+            if not os.path.exists(path):
+                return None
+            digests[name] = file_digest(path)
+        return digests
+
+    def start(self, slug: str = KAGGLE_DATASET, version: str = DATASET_VERSION, **kwargs: Any) -> Tuple[DownloadTask, bool]:
+        """
+        Run `download` in a background thread, or join the one in progress.
+
+        Args:
+            slug (str): The dataset, as "owner/name".
+            version (str): A version number, or "latest".
+            **kwargs: Other arguments of `download`.
+
+        Returns:
+            tuple: The task and whether it was newly created.
+        """
+        key = (slug, version)
+        with self._lock:
+            active = self._active.get(key)
+            if active is not None:
+                return active, False
+            task = DownloadTask(key)
+            self._tasks[task.id] = task
+            self._active[key] = task
+
+        def run() -> None:
+            try:
+                task.result = self.download(
+                    slug, version, progress=task.progress, on_stage=lambda name: setattr(task, "stage", name), **kwargs
+                )
+                task.stage = "done"
+            except Exception as e:
+                logger.warning("Download of %s failed: %s", slug, e)
+                task.error = str(e)
+            finally:
+                task.finished_at = time.time()
+                self._finish(task)
+
+        threading.Thread(target=run, name=f"download-{task.id[:8]}", daemon=True).start()
+        return task, True
+
+    def _finish(self, task: DownloadTask) -> None:
+        with self._lock:
+            if self._active.get(task.key) is task:
+                del self._active[task.key]
+            finished = [t for t in self._tasks.values() if t.finished_at is not None]
+            for old in finished[: max(0, len(finished) - self.max_finished)]:
+                del self._tasks[old.id]
+
+    def get(self, download_id: str) -> Optional[DownloadTask]:
+        """Return a download by id, or None if it is unknown or was pruned."""
+        return self._tasks.get(download_id)
+
+
+download_manager = DownloadManager()
@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class Job:
+    """A unit of work submitted to the job manager."""
+
+    def __init__(self, kind: str, key: Optional[str], future: Future) -> None:
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.future = future
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        # Set once the job is finished and its success callback has run, so
+        # a job never reports "succeeded" before its effects are visible.
+        self.finished = threading.Event()
+
+    @property
+    def status(self) -> str:
+        """One of "queued", "running", "succeeded" or "failed"."""
+        if not self.finished.is_set():
+            return "running" if self.future.running() or self.future.done() else "queued"
+        return "failed" if self.error is not None else "succeeded"
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Summarize the job without its result.
+
+        Returns:
+            dict: Id, kind, status, timestamps and the error if it failed.
+        """
+        summary = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at,
+        }
+        if summary["status"] == "failed":
+            summary["error"] = self.error
+        return summary
+
+
+class JobManager:
+    """
+    Run long tasks on a process pool and track them by id.
+
+    The pool is created on the first submission. Submitting a task whose
+    `key` matches a job that is still queued or running returns that job
+    instead of starting a duplicate. Only the `max_finished` most recent
+    finished jobs are kept.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_finished: int = 100,
+        executor_factory: Optional[Callable[[], Executor]] = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_finished = max_finished
+        self._executor_factory = executor_factory or self._process_pool
+        self._executor: Optional[Executor] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _process_pool(self) -> Executor:
+        # Spawned workers do not inherit the server's threads and locks.
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        key: Optional[str] = None,
+        on_success: Optional[Callable[[Any], None]] = None,
+    ) -> Tuple[Job, bool]:
+        """
+        Submit a task, or join an identical one already in progress.
+
+        Args:
+            kind (str): A label for the type of task, e.g. "train".
+            fn (callable): A picklable top-level function.
+            *args: Picklable arguments for `fn`.
+            key (str): De-duplication key; jobs with the same key share a run.
+            on_success (callable): Called in this process with the result.
+
+        Returns:
+            tuple: The job and whether it was newly created.
+        """
+        with self._lock:
+            if key is not None:
+                active = self._active.get(key)
+                if active is not None and not active.finished.is_set():
+                    return active, False
+
+            if self._executor is None:
+                self._executor = self._executor_factory()
+            job = Job(kind, key, self._executor.submit(fn, *args))
+            self._jobs[job.id] = job
+            if key is not None:
+                self._active[key] = job
+
+        job.future.add_done_callback(lambda _: self._finish(job, on_success))
+        return job, True
+
+    def _finish(self, job: Job, on_success: Optional[Callable[[Any], None]]) -> None:
+        try:
+            if job.future.cancelled():
+                job.error = "cancelled"
+            elif job.future.exception() is not None:
+                job.error = str(job.future.exception())
+            elif on_success is not None:
+                on_success(job.future.result())
+        except Exception as e:
+            job.error = f"Job succeeded but its completion handler failed: {e}"
+        finally:
+            job.finished_at = time.time()
+            job.finished.set()
+
+        with self._lock:
+            if job.key is not None and self._active.get(job.key) is job:
+                del self._active[job.key]
+            finished = [j for j in self._jobs.values() if j.finished.is_set()]
+            for old in finished[: max(0, len(finished) - self.max_finished)]:
+                del self._jobs[old.id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by id, or None if it is unknown or was pruned."""
+        return self._jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, waiting for running jobs."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+job_manager = JobManager(max_workers=int(os.getenv("JOB_WORKERS", "2")))
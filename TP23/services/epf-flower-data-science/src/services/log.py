@@ -0,0 +1,130 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Optional
+
+LOGGER_NAMESPACE = "epf"
+
+APP_ENV = os.getenv("APP_ENV", "local")
+_PRODUCTION = APP_ENV == "prd"
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING" if _PRODUCTION else "INFO").upper()
+LOG_PAYLOADS = os.getenv("LOG_PAYLOADS", "0" if _PRODUCTION else "1") == "1"
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01" if _PRODUCTION else "1"))
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, with any `fields` extra merged in."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records below WARNING."""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Hand records to the listener thread without formatting them first."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class LazyRepr:
+    """Defer an expensive `str()` until a record is actually emitted."""
+
+    __slots__ = ("factory",)
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self.factory = factory
+
+    def __str__(self) -> str:
+        return str(self.factory())
+
+
+def configure_logging() -> None:
+    """
+    Install the application's log pipeline once per process.
+
+    Records are queued by the request threads and formatted and written to
+    stdout by a background listener thread. The level, payload logging and
+    hot-path sampling rate come from LOG_LEVEL, LOG_PAYLOADS and
+    LOG_SAMPLE_RATE, with quieter defaults when APP_ENV=prd.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger(LOGGER_NAMESPACE)
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    root.propagate = False
+
+
+def get_logger(name: str, sampled: bool = False) -> logging.Logger:
+    """
+    Get a logger under the application namespace.
+
+    Args:
+        name (str): The logger name, usually the module name.
+        sampled (bool): Whether records below WARNING are sampled at
+            LOG_SAMPLE_RATE, for hot paths such as predictions.
+
+    Returns:
+        logging.Logger: The logger.
+    """
+    logger = logging.getLogger(f"{LOGGER_NAMESPACE}.{name}")
+    if sampled and LOG_SAMPLE_RATE < 1 and not any(
+        isinstance(f, SamplingFilter) for f in logger.filters
+    ):
+        logger.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+    return logger
+
+
+def log_payload(logger: logging.Logger, message: str, factory: Callable[[], Any]) -> None:
+    """
+    Log request data at DEBUG level, unless payload logging is disabled.
+
+    The payload is only built and formatted if the record is emitted.
+
+    Args:
+        logger (logging.Logger): The logger to use.
+        message (str): A %-style message with one placeholder for the payload.
+        factory (callable): Builds the payload to log.
+    """
+    if LOG_PAYLOADS and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(message, LazyRepr(factory))
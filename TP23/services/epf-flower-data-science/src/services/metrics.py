@@ -0,0 +1,179 @@
+import bisect
+import contextlib
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with one series per label combination.
+
+    Observations only increment a bucket counter, a sum and a count, so
+    the cost per observation does not depend on how many were recorded.
+    """
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float]) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value (float): The observed value.
+            *labels (str): The label values, in the order of `labels`.
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # One counter per bucket, then +Inf, sum and count.
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def collect(self) -> Iterator[str]:
+        """Yield the exposition lines of every series."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), values):
+                cumulative += count
+                le = 'le="' + str(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {values[-2]}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {values[-1]}"
+
+
+class Gauge:
+    """A single value that goes up and down."""
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def add(self, amount: int) -> None:
+        """Change the value by `amount`."""
+        with self._lock:
+            self.value += amount
+
+    def collect(self) -> Iterator[str]:
+        """Yield the exposition lines of the gauge."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {self.value}"
+
+
+class Metrics:
+    """
+    The application's request and span metrics.
+
+    When disabled, nothing is recorded: the middleware is not installed and
+    `span` returns a shared no-op context manager.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED) -> None:
+        self.enabled = enabled
+        self.request_duration = Histogram(
+            "http_request_duration_seconds",
+            "Time spent serving HTTP requests.",
+            ("method", "route", "status"),
+            LATENCY_BUCKETS,
+        )
+        self.response_size = Histogram(
+            "http_response_size_bytes",
+            "Size of HTTP response bodies.",
+            ("method", "route"),
+            SIZE_BUCKETS,
+        )
+        self.in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+        self.span_duration = Histogram(
+            "span_duration_seconds",
+            "Time spent in instrumented operations.",
+            ("span",),
+            LATENCY_BUCKETS,
+        )
+
+    @contextlib.contextmanager
+    def _span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.span_duration.observe(time.perf_counter() - start, name)
+
+    def span(self, name: str):
+        """
+        Time a block of code, e.g. `with metrics.span("model_load"):`.
+
+        Works around `await` too, so the time of an awaited RPC is recorded.
+
+        Args:
+            name (str): The operation name.
+
+        Returns:
+            A context manager.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name)
+
+    def observe_request(self, method: str, route: str, status: int, duration: float, size: int) -> None:
+        """
+        Record a served request.
+
+        Args:
+            method (str): The HTTP method.
+            route (str): The route template, e.g. /v1/users.
+            status (int): The response status code.
+            duration (float): The time to serve it, in seconds.
+            size (int): The response body size, in bytes.
+        """
+        self.request_duration.observe(duration, method, route, str(status))
+        self.response_size.observe(size, method, route)
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition.
+        """
+        lines: List[str] = []
+        for metric in (self.request_duration, self.response_size, self.in_flight, self.span_duration):
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
@@ -0,0 +1,134 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+from src.services.metrics import metrics
+from src.services.tree_engine import load_or_compile
+from src.services.utils import atomic_write_bytes
+
+MODEL_PATH = "src/models/random_forest_model.pkl"
+
+
+class LoadedModel(NamedTuple):
+    """A deserialized model together with the version of the artifact it came from."""
+
+    model: Any
+    version: str
+    loaded_at: float
+    engine: Any = None
+
+
+class ModelRegistry:
+    """
+    Keep one deserialized copy of a model artifact per worker.
+
+    The artifact is only unpickled again when its stat signature (mtime, size,
+    inode) changes, and the new model replaces the old one in a single
+    assignment, so concurrent requests always see a fully loaded model.
+    An optional `compiler` builds an alternative inference engine from each
+    newly loaded model; it is swapped in together with the model.
+    """
+
+    def __init__(
+        self,
+        path: str = MODEL_PATH,
+        compiler: Optional[Callable[[Any, str], Any]] = None,
+    ) -> None:
+        self.path = path
+        self.compiler = compiler
+        self._lock = threading.Lock()
+        self._entry: Optional[Tuple[tuple, LoadedModel]] = None
+
+    def _signature(self) -> tuple:
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def get(self) -> LoadedModel:
+        """
+        Return the current model, reloading it if the artifact changed on disk.
+
+        While a new artifact is being loaded, other requests keep being served
+        by the previous model instead of waiting.
+
+        Returns:
+            LoadedModel: The model and its version.
+
+        Raises:
+            FileNotFoundError: If the artifact does not exist.
+        """
+        signature = self._signature()
+        entry = self._entry
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        if not self._lock.acquire(blocking=entry is None):
+            return entry[1]
+        try:
+            entry = self._entry
+            if entry is not None and entry[0] == signature:
+                return entry[1]
+            return self._load(signature)
+        finally:
+            self._lock.release()
+
+    def refresh(self) -> LoadedModel:
+        """
+        Force a reload check, e.g. right after a new artifact was written.
+
+        Returns:
+            LoadedModel: The model and its version.
+        """
+        with self._lock:
+            return self._load(self._signature())
+
+    def _load(self, signature: tuple) -> LoadedModel:
+        with open(self.path, "rb") as f:
+            payload = f.read()
+        version = _content_version(payload)
+
+        entry = self._entry
+        if entry is not None and entry[1].version == version:
+            loaded = entry[1]
+        else:
+            import joblib
+
+            with metrics.span("model_load"):
+                model = joblib.load(io.BytesIO(payload))
+            loaded = LoadedModel(
+                model=model,
+                version=version,
+                loaded_at=time.time(),
+                engine=self.compiler(model, version) if self.compiler else None,
+            )
+        self._entry = (signature, loaded)
+        return loaded
+
+
+def _content_version(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()[:12]
+
+
+def save_model(model: Any, path: str = MODEL_PATH) -> str:
+    """
+    Serialize a model and replace the artifact atomically.
+
+    Args:
+        model: The fitted estimator.
+        path (str): The destination of the artifact.
+
+    Returns:
+        str: The version of the written artifact.
+    """
+    import joblib
+
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    payload = buffer.getvalue()
+    atomic_write_bytes(path, payload)
+    return _content_version(payload)
+
+
+model_registry = ModelRegistry(MODEL_PATH, compiler=load_or_compile)
@@ -0,0 +1,40 @@
+from firestore import AsyncFirestoreClient
+
+PARAMETERS_COLLECTION = "parameters"
+PARAMETERS_DOCUMENT = "parameters"
+DEFAULT_PARAMETERS = {"n_estimators": 100, "criterion": "gini"}
+
+
+async def create_parameters(firestore_client: AsyncFirestoreClient, params: dict = DEFAULT_PARAMETERS) -> None:
+    """
+    Create the parameters document.
+
+    Args:
+        firestore_client (AsyncFirestoreClient): The database client.
+        params (dict): The initial parameters.
+    """
+    await firestore_client.create(PARAMETERS_COLLECTION, PARAMETERS_DOCUMENT, dict(params))
+
+
+async def retrieve_parameters(firestore_client: AsyncFirestoreClient) -> dict:
+    """
+    Retrieve the parameters document.
+
+    Args:
+        firestore_client (AsyncFirestoreClient): The database client.
+
+    Returns:
+        dict: The parameters, or None if the document does not exist.
+    """
+    return await firestore_client.get(PARAMETERS_COLLECTION, PARAMETERS_DOCUMENT)
+
+
+async def update_parameters(firestore_client: AsyncFirestoreClient, params: dict) -> None:
+    """
+    Update fields of the parameters document.
+
+    Args:
+        firestore_client (AsyncFirestoreClient): The database client.
+        params (dict): The fields to update.
+    """
+    await firestore_client.update(PARAMETERS_COLLECTION, PARAMETERS_DOCUMENT, params)
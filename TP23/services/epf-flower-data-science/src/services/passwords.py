@@ -0,0 +1,200 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from src.services.metrics import metrics
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "64"))
+# Bulk hashing runs one batch at a time, on at most this many workers.
+PASSWORD_HASH_BULK_WORKERS = int(os.getenv("PASSWORD_HASH_BULK_WORKERS", "1"))
+
+
+class HasherBusy(Exception):
+    """Raised when too many password operations are already waiting."""
+
+
+@lru_cache(maxsize=None)
+def _context(rounds: int) -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+def _hash(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+
+def _verify_and_update(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return _context(rounds).verify_and_update(password, hashed)
+
+
+class _Timing:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def describe(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class PasswordHasher:
+    """
+    Hash and verify passwords with bcrypt on a dedicated process pool.
+
+    At most `max_workers + max_queue` operations may be in flight; beyond
+    that, `hash` and `verify` raise HasherBusy instead of queueing, so a
+    login burst cannot grow an unbounded backlog. Bulk hashing counts
+    against the same bound and holds at most `bulk_workers` slots. All
+    methods must be called from the event loop.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = PASSWORD_HASH_WORKERS,
+        max_queue: int = PASSWORD_HASH_QUEUE,
+        rounds: int = BCRYPT_ROUNDS,
+        executor_factory: Optional[Callable[[], Executor]] = None,
+        bulk_workers: int = PASSWORD_HASH_BULK_WORKERS,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.bulk_workers = max(1, min(bulk_workers, max_workers))
+        self._bulk_running = False
+        self.rounds = rounds
+        self._executor_factory = executor_factory or self._process_pool
+        self._executor: Optional[Executor] = None
+        self.in_flight = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self._timings = {"hash": _Timing(), "verify": _Timing()}
+
+    def _process_pool(self) -> Executor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    async def _run(self, operation: str, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HasherBusy("Too many password operations in progress.")
+        if self._executor is None:
+            self._executor = self._executor_factory()
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            with metrics.span(f"password_{operation}"):
+                return await asyncio.wrap_future(self._executor.submit(fn, *args, self.rounds))
+        finally:
+            self.in_flight -= 1
+            self._timings[operation].record((time.perf_counter() - start) * 1000)
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password.
+
+        Args:
+            password (str): The plain-text password.
+
+        Returns:
+            str: The bcrypt hash.
+
+        Raises:
+            HasherBusy: If the queue is full.
+        """
+        return await self._run("hash", _hash, password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        Hash many passwords, `bulk_workers` at a time.
+
+        Only one bulk call runs at a time, and its rounds count against the
+        same bound as `hash`, so bulk work never holds more than
+        `bulk_workers` slots and interactive logins keep the rest.
+
+        Args:
+            passwords (list): The plain-text passwords.
+
+        Returns:
+            list: The bcrypt hashes, in the same order.
+
+        Raises:
+            HasherBusy: If another bulk call is running or the queue is full.
+        """
+        if self._bulk_running:
+            self.rejected += 1
+            raise HasherBusy("Another bulk password operation is in progress.")
+        self._bulk_running = True
+        try:
+            hashes: List[str] = []
+            for start in range(0, len(passwords), self.bulk_workers):
+                window = passwords[start:start + self.bulk_workers]
+                hashes.extend(await asyncio.gather(*(self._run("hash", _hash, password) for password in window)))
+            return hashes
+        finally:
+            self._bulk_running = False
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password, and rehash it if the hash uses outdated settings.
+
+        Args:
+            password (str): The plain-text password.
+            hashed (str): The stored hash.
+
+        Returns:
+            tuple: Whether the password matches, and a new hash to store when
+            the configured cost changed since `hashed` was made, else None.
+
+        Raises:
+            HasherBusy: If the queue is full.
+        """
+        valid, new_hash = await self._run("verify", _verify_and_update, password, hashed)
+        if new_hash is not None:
+            self.rehashed += 1
+        return valid, new_hash
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the pool load and operation latencies.
+
+        Returns:
+            dict: Workers, queue depth and capacity, rejections, rehashes and
+            per-operation latency.
+        """
+        return {
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.max_workers),
+            "queue_capacity": self.max_queue,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+            "hash": self._timings["hash"].describe(),
+            "verify": self._timings["verify"].describe(),
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher()
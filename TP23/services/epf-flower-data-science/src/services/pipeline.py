@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from src.services.data import DATASET_PATH, STORE_DIR, dataset_store
+from src.services.metrics import metrics
+from src.services.model_registry import model_registry, save_model
+from src.services.tree_engine import export_forest
+from src.services.utils import atomic_write_bytes, file_digest
+
+PARAMS_PATH = "src/config/model_parameters.json"
+SPLIT_PARAMS = {"test_size": 0.2, "random_state": 42}
+PIPELINE_STATE_PATH = os.path.join(STORE_DIR, "pipeline_state.json")
+
+
+def load_model_parameters(path: str = PARAMS_PATH) -> dict:
+    """
+    Retrieve the model parameters from the json configuration file.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        dict: The RandomForestClassifier parameters.
+    """
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def preprocess(source: str = DATASET_PATH) -> str:
+    """
+    Encode the species as category codes and save the processed dataset.
+
+    Args:
+        source (str): The path of the raw CSV dataset.
+
+    Returns:
+        str: The path of the processed dataset in the store.
+    """
+    import pandas as pd
+
+    with metrics.span("csv_parse"):
+        df = pd.read_csv(source)
+    df["Species"] = df["Species"].astype("category").cat.codes
+    dataset_store.save("iris_processed", df)
+    return dataset_store.path("iris_processed")
+
+
+def split() -> None:
+    """Split the processed dataset into train and test sets in the store."""
+    from sklearn.model_selection import train_test_split
+
+    df = dataset_store.load("iris_processed")
+
+    if "Id" in df.columns:
+        df = df.drop(columns=["Id"])
+
+    X = df.drop(columns=["Species"])
+    y = df["Species"]
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, **SPLIT_PARAMS)
+
+    dataset_store.save("train", X_train)
+    dataset_store.save("test", X_test)
+    dataset_store.save("y_train", y_train.to_frame())
+    dataset_store.save("y_test", y_test.to_frame())
+
+
+def train(params: Optional[dict] = None, refresh: bool = True) -> str:
+    """
+    Fit a RandomForestClassifier on the training split and publish it.
+
+    The artifact is replaced atomically, so concurrent trainings never
+    leave a partially written model behind.
+
+    Args:
+        params (dict): The model parameters; read from PARAMS_PATH if not given.
+        refresh (bool): Whether to load the new model into this process's registry.
+
+    Returns:
+        str: The version of the saved model artifact.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    if params is None:
+        params = load_model_parameters()
+
+    X_train = dataset_store.load("train")
+    y_train = dataset_store.load("y_train").squeeze("columns")
+
+    model = RandomForestClassifier(**params)
+    model.fit(X_train, y_train)
+
+    version = save_model(model, model_registry.path)
+    export_forest(model, version)
+    if refresh:
+        model_registry.refresh()
+    return version
+
+
+def run_training_job(params: dict) -> Dict[str, Any]:
+    """
+    Train in a job worker process.
+
+    Args:
+        params (dict): The model parameters.
+
+    Returns:
+        dict: The model version, parameters and fit duration.
+    """
+    start = time.perf_counter()
+    version = train(params, refresh=False)
+    return {
+        "model_version": version,
+        "params": params,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+
+class PipelineStep(NamedTuple):
+    """A pipeline step, its fingerprinted inputs and the files it produces."""
+
+    name: str
+    inputs: Callable[[], Dict[str, Any]]
+    outputs: Callable[[], List[str]]
+    run: Callable[[], Any]
+
+
+STEPS = [
+    PipelineStep(
+        name="preprocess",
+        inputs=lambda: {"dataset": file_digest(DATASET_PATH)},
+        outputs=lambda: [dataset_store.path("iris_processed")],
+        run=preprocess,
+    ),
+    PipelineStep(
+        name="split",
+        inputs=lambda: {"iris_processed": dataset_store.digest("iris_processed"), "params": SPLIT_PARAMS},
+        outputs=lambda: [dataset_store.path(name) for name in ("train", "test", "y_train", "y_test")],
+        run=split,
+    ),
+    PipelineStep(
+        name="train",
+        inputs=lambda: {
+            "train": dataset_store.digest("train"),
+            "y_train": dataset_store.digest("y_train"),
+            "params": load_model_parameters(),
+        },
+        outputs=lambda: [model_registry.path],
+        run=train,
+    ),
+]
+
+_run_lock = threading.Lock()
+
+
+def _fingerprint(step: PipelineStep) -> str:
+    payload = json.dumps({"step": step.name, "inputs": step.inputs()}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _output_digests(step: PipelineStep) -> Optional[Dict[str, str]]:
+    digests = {}
+    for path in step.outputs():
+        if not os.path.exists(path):
+            return None
+        digests[path] = file_digest(path)
+    return digests
+
+
+def _load_state(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def run_pipeline(
+    force: bool = False,
+    steps: List[PipelineStep] = STEPS,
+    state_path: str = PIPELINE_STATE_PATH,
+) -> Dict[str, Any]:
+    """
+    Run the preprocess -> split -> train steps, skipping the up-to-date ones.
+
+    A step is up to date when the fingerprint of its inputs (content hashes
+    of the files it reads plus its parameters) matches the last run and its
+    outputs are still the files that run produced. Since a step's inputs are
+    the previous step's outputs, a change anywhere only reruns the steps
+    downstream of it whose inputs actually changed.
+
+    Args:
+        force (bool): Run every step even if it is up to date.
+        steps (list): The steps, in dependency order.
+        state_path (str): Where the fingerprints of the last runs are kept.
+
+    Returns:
+        dict: Per-step status ("cached" or "ran") and timing, and the number
+        of cache hits.
+    """
+    with _run_lock:
+        state = _load_state(state_path)
+        report = []
+        for step in steps:
+            start = time.perf_counter()
+            fingerprint = _fingerprint(step)
+            previous = state.get(step.name, {})
+
+            if (
+                not force
+                and previous.get("fingerprint") == fingerprint
+                and _output_digests(step) == previous.get("outputs")
+            ):
+                status = "cached"
+            else:
+                step.run()
+                state[step.name] = {"fingerprint": fingerprint, "outputs": _output_digests(step)}
+                atomic_write_bytes(state_path, json.dumps(state, indent=2).encode())
+                status = "ran"
+
+            report.append({
+                "step": step.name,
+                "status": status,
+                "fingerprint": fingerprint[:12],
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+            })
+
+        return {
+            "steps": report,
+            "cache_hits": sum(entry["status"] == "cached" for entry in report),
+        }
@@ -0,0 +1,195 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Tuple
+
+
+class RateLimitResult(NamedTuple):
+    """The outcome of one request against a limit."""
+
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+def _slide(
+    state: Tuple[int, int, int], now: float, limit: int, interval: float
+) -> Tuple[Tuple[int, int, int], RateLimitResult]:
+    """
+    Apply one request to a sliding-window counter.
+
+    The state is (window, previous window count, current window count).
+    The request rate is estimated as the current count plus the previous
+    count weighted by how much of the previous window still overlaps the
+    last `interval` seconds.
+    """
+    window = int(now // interval)
+    stored_window, previous, current = state
+    if stored_window != window:
+        previous = current if stored_window == window - 1 else 0
+        current = 0
+
+    overlap = 1 - (now % interval) / interval
+    estimated = previous * overlap + current
+    if estimated + 1 > limit:
+        # Time until enough of the previous window has slid out.
+        if current + 1 > limit or previous == 0:
+            retry_after = (window + 1) * interval - now
+        else:
+            retry_after = (estimated + 1 - limit) / previous * interval
+        return (window, previous, current), RateLimitResult(False, 0, retry_after)
+
+    current += 1
+    remaining = max(0, math.floor(limit - estimated - 1))
+    return (window, previous, current), RateLimitResult(True, remaining, 0.0)
+
+
+class MemoryRateLimiter:
+    """
+    Sliding-window counters for this process, three integers per key.
+
+    Keys are kept in least-recently-used order, so keys idle for more than
+    two windows are dropped from the front as new requests come in, and no
+    more than `max_keys` are ever tracked.
+    """
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._states: "OrderedDict[str, Tuple[int, int, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, interval: float) -> RateLimitResult:
+        """
+        Count a request for a key.
+
+        Args:
+            key (str): The client key, including the limit's scope.
+            limit (int): The number of requests allowed per interval.
+            interval (float): The window length in seconds.
+
+        Returns:
+            RateLimitResult: Whether the request is allowed.
+        """
+        now = time.time()
+        with self._lock:
+            state = self._states.pop(key, None)
+            state, result = _slide(state[:3] if state else (0, 0, 0), now, limit, interval)
+            self._states[key] = (*state, now + 2 * interval)
+            self._evict(now)
+        return result
+
+    def _evict(self, now: float) -> None:
+        while self._states:
+            key, state = next(iter(self._states.items()))
+            if state[3] > now and len(self._states) <= self.max_keys:
+                return
+            del self._states[key]
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+class SqliteRateLimiter:
+    """
+    Sliding-window counters in a SQLite table shared by every worker on the host.
+
+    Each request is one read-modify-write transaction. Rows idle for more
+    than two windows are deleted every `sweep_every` requests.
+    """
+
+    def __init__(self, path: str, sweep_every: int = 1000) -> None:
+        self.path = path
+        self.sweep_every = sweep_every
+        self._calls = 0
+        self._calls_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, window INTEGER, previous INTEGER, current INTEGER, idle_at REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS rate_limits_idle_at ON rate_limits (idle_at)")
+            self._local.connection = connection
+        return connection
+
+    def hit(self, key: str, limit: int, interval: float) -> RateLimitResult:
+        """
+        Count a request for a key.
+
+        Args:
+            key (str): The client key, including the limit's scope.
+            limit (int): The number of requests allowed per interval.
+            interval (float): The window length in seconds.
+
+        Returns:
+            RateLimitResult: Whether the request is allowed.
+        """
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT window, previous, current FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+            state, result = _slide(row or (0, 0, 0), now, limit, interval)
+            connection.execute(
+                "INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?, ?, ?)",
+                (key, *state, now + 2 * interval),
+            )
+            # hit runs on several threads, each with its own connection.
+            with self._calls_lock:
+                self._calls += 1
+                sweep = self._calls % self.sweep_every == 0
+            if sweep:
+                connection.execute("DELETE FROM rate_limits WHERE idle_at <= ?", (now,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return result
+
+
+def parse_limit(value: str) -> Tuple[int, float]:
+    """
+    Parse a "requests/seconds" limit, e.g. "600/60".
+
+    Args:
+        value (str): The limit.
+
+    Returns:
+        tuple: The number of requests and the interval in seconds.
+    """
+    requests, seconds = value.split("/")
+    return int(requests), float(seconds)
+
+
+def create_rate_limiter(backend: str, sqlite_path: str = "src/data/database.sqlite"):
+    """
+    Build the rate limiter for a backend.
+
+    Args:
+        backend (str): "memory" for one process, "sqlite" to share the
+            counters between the workers of a host.
+        sqlite_path (str): The database file of the sqlite backend.
+
+    Returns:
+        The rate limiter.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if backend == "memory":
+        return MemoryRateLimiter()
+    if backend == "sqlite":
+        return SqliteRateLimiter(sqlite_path)
+    raise ValueError(f"Unknown rate limit backend: {backend}")
@@ -0,0 +1,199 @@
+import hashlib
+import heapq
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from firestore import AsyncFirestoreClient
+
+REVOKED_TOKENS_COLLECTION = "revoked_tokens"
+_MISSING = object()
+
+
+def token_key(token: str) -> str:
+    """
+    Key a token is stored under; raw bearer tokens are never persisted.
+
+    Args:
+        token (str): The token.
+
+    Returns:
+        str: The SHA-256 of the token.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _is_live(expires_at: Optional[float], now: float) -> bool:
+    return expires_at is None or expires_at > now
+
+
+class MemoryRevocationStore:
+    """
+    Revoked tokens of this process, in a dict with a heap of expiry times.
+
+    Only suitable for a single worker: other processes do not see revocations.
+    """
+
+    def __init__(self) -> None:
+        self._revoked: Dict[str, float] = {}
+        self._expiries: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float) -> None:
+        while self._expiries and self._expiries[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiries)
+            if self._revoked.get(key) == expires_at:
+                del self._revoked[key]
+
+    async def revoke(self, token: str, expires_at: float) -> bool:
+        """
+        Revoke a token until it expires.
+
+        Args:
+            token (str): The token.
+            expires_at (float): When the token expires, as a Unix time.
+
+        Returns:
+            bool: False if the token was already revoked.
+        """
+        key = token_key(token)
+        with self._lock:
+            self._purge(time.time())
+            if key in self._revoked:
+                return False
+            self._revoked[key] = expires_at
+            heapq.heappush(self._expiries, (expires_at, key))
+            return True
+
+    async def is_revoked(self, token: str) -> bool:
+        """Whether a token has been revoked and has not expired yet."""
+        expires_at = self._revoked.get(token_key(token), _MISSING)
+        return expires_at is not _MISSING and _is_live(expires_at, time.time())
+
+
+class SqliteRevocationStore:
+    """
+    Revoked tokens in a SQLite table, shared by every worker on the host.
+
+    The table is created on first use. Expired entries are deleted on
+    each revocation.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS revoked_tokens (token_hash TEXT PRIMARY KEY, expires_at REAL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS revoked_tokens_expires_at ON revoked_tokens (expires_at)"
+            )
+            self._local.connection = connection
+        return connection
+
+    async def revoke(self, token: str, expires_at: float) -> bool:
+        """
+        Revoke a token until it expires.
+
+        Args:
+            token (str): The token.
+            expires_at (float): When the token expires, as a Unix time.
+
+        Returns:
+            bool: False if the token was already revoked.
+        """
+        # sqlite3 blocks, on the busy timeout too, so it runs off the event loop.
+        return await run_in_threadpool(self._revoke, token_key(token), expires_at)
+
+    async def is_revoked(self, token: str) -> bool:
+        """Whether a token has been revoked and has not expired yet."""
+        return await run_in_threadpool(self._is_revoked, token_key(token))
+
+    def _revoke(self, key: str, expires_at: float) -> bool:
+        connection = self._connection()
+        connection.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (time.time(),))
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO revoked_tokens (token_hash, expires_at) VALUES (?, ?)", (key, expires_at)
+        )
+        return cursor.rowcount == 1
+
+    def _is_revoked(self, key: str) -> bool:
+        row = self._connection().execute(
+            "SELECT expires_at FROM revoked_tokens WHERE token_hash = ?", (key,)
+        ).fetchone()
+        return row is not None and _is_live(row[0], time.time())
+
+
+class FirestoreRevocationStore:
+    """
+    Revoked tokens in a Firestore collection, shared by every instance.
+
+    Each document carries `expires_at`, which a Firestore TTL policy can use
+    to delete it; expired entries are ignored either way.
+    """
+
+    def __init__(self, firestore_client: AsyncFirestoreClient, collection: str = REVOKED_TOKENS_COLLECTION) -> None:
+        self.firestore_client = firestore_client
+        self.collection = collection
+
+    async def revoke(self, token: str, expires_at: float) -> bool:
+        """
+        Revoke a token until it expires.
+
+        Args:
+            token (str): The token.
+            expires_at (float): When the token expires, as a Unix time.
+
+        Returns:
+            bool: False if the token was already revoked.
+        """
+        if await self.is_revoked(token):
+            return False
+        await self.firestore_client.create(self.collection, token_key(token), {"expires_at": expires_at})
+        return True
+
+    async def is_revoked(self, token: str) -> bool:
+        """Whether a token has been revoked and has not expired yet."""
+        document = await self.firestore_client.get(self.collection, token_key(token))
+        return document is not None and _is_live(document.get("expires_at"), time.time())
+
+
+def create_revocation_store(
+    backend: str,
+    sqlite_path: str = "src/data/database.sqlite",
+    firestore_client: Optional[AsyncFirestoreClient] = None,
+):
+    """
+    Build the revocation store for a backend.
+
+    Args:
+        backend (str): "memory", "sqlite" or "firestore".
+        sqlite_path (str): The database file of the sqlite backend.
+        firestore_client (AsyncFirestoreClient): The client of the firestore
+            backend; FIRESTORE_BACKEND=memory makes it a local stand-in.
+
+    Returns:
+        The store.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if backend == "memory":
+        return MemoryRevocationStore()
+    if backend == "sqlite":
+        return SqliteRevocationStore(sqlite_path)
+    if backend == "firestore":
+        return FirestoreRevocationStore(firestore_client)
+    raise ValueError(f"Unknown token revocation backend: {backend}")
@@ -0,0 +1,116 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from src.services.cache import TTLCache
+from src.services.log import APP_ENV, get_logger
+
+TOKEN_TTL = int(os.getenv("TOKEN_TTL", "3600"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+# Environments allowed to run without TOKEN_SECRET, on a random secret.
+LOCAL_ENVS = ("local", "test")
+
+logger = get_logger("tokens")
+
+
+class InvalidToken(Exception):
+    """Raised when a token is malformed, forged or expired."""
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+_HEADER = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+
+class TokenSigner:
+    """
+    Issue and verify HS256 JSON Web Tokens carrying the user's email and role.
+
+    Verified tokens are kept in a bounded LRU for their remaining lifetime,
+    so a client reusing its token skips the signature check.
+    """
+
+    def __init__(self, secret: str, ttl: int = TOKEN_TTL, cache_size: int = TOKEN_CACHE_SIZE) -> None:
+        self._secret = secret.encode()
+        self.ttl = ttl
+        self.cache = TTLCache(cache_size)
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return _b64encode(hmac.new(self._secret, signing_input, hashlib.sha256).digest())
+
+    def issue(self, email: str, role: str) -> Tuple[str, int]:
+        """
+        Create a token for a user.
+
+        Args:
+            email (str): The user's email, stored as the `sub` claim.
+            role (str): The user's role.
+
+        Returns:
+            tuple: The token and its expiry as a Unix time.
+        """
+        now = int(time.time())
+        claims = {"sub": email, "role": role, "iat": now, "exp": now + self.ttl, "jti": uuid.uuid4().hex}
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = _HEADER + b"." + payload
+        return (signing_input + b"." + self._sign(signing_input)).decode(), claims["exp"]
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Check a token's signature and expiry.
+
+        Args:
+            token (str): The token.
+
+        Returns:
+            dict: The token claims.
+
+        Raises:
+            InvalidToken: If the token is malformed, forged or expired.
+        """
+        found, claims = self.cache.get(token)
+        if found:
+            return claims
+
+        parts = token.split(".")
+        if len(parts) != 3:
+            raise InvalidToken("Invalid token format.")
+        signing_input = f"{parts[0]}.{parts[1]}".encode()
+        if not hmac.compare_digest(self._sign(signing_input), parts[2].encode()):
+            raise InvalidToken("Invalid token signature.")
+        try:
+            claims = json.loads(_b64decode(parts[1]))
+        except ValueError:
+            raise InvalidToken("Invalid token format.")
+
+        remaining = claims.get("exp", 0) - time.time()
+        if remaining <= 0:
+            raise InvalidToken("Token has expired.")
+        self.cache.set(token, claims, remaining)
+        return claims
+
+
+def _secret() -> str:
+    secret: Optional[str] = os.getenv("TOKEN_SECRET")
+    if secret:
+        return secret
+    if APP_ENV not in LOCAL_ENVS:
+        raise RuntimeError(f"TOKEN_SECRET must be set when APP_ENV={APP_ENV}.")
+    # Tokens then only verify in this process, and not after a restart.
+    logger.warning("TOKEN_SECRET is not set, signing tokens with a random secret for this process")
+    return secrets.token_urlsafe(32)
+
+
+token_signer = TokenSigner(_secret())
@@ -0,0 +1,277 @@
+import io
+import os
+from typing import Any, Optional
+
+import numpy as np
+
+from src.services.utils import atomic_write_bytes
+
+COMPILED_MODEL_PATH = "src/models/random_forest_model.npz"
+
+# Number of (tree, row) pairs traversed at once; bounds the temporaries.
+_CHUNK_ELEMENTS = 1 << 20
+
+
+class CompiledForest:
+    """
+    A tree ensemble flattened into contiguous NumPy arrays.
+
+    All trees share one node table: `feature`, `threshold`, `left`, `right`
+    and `value` (the normalized class distribution of each node). Leaves
+    point to themselves. A batch is pushed down every tree at once, one
+    level per step, and (tree, row) pairs leave the working set as soon as
+    they reach a leaf. Predictions match
+    `RandomForestClassifier.predict_proba`/`predict` exactly: inputs are
+    cast to float32 like sklearn's tree code, and tree probabilities are
+    accumulated in estimator order before being averaged.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        classes: np.ndarray,
+        max_depth: int,
+        n_features: int,
+    ) -> None:
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.source_version: Optional[str] = None
+
+    @classmethod
+    def from_sklearn(cls, model: Any) -> "CompiledForest":
+        """
+        Flatten a fitted sklearn forest classifier.
+
+        Args:
+            model: A fitted RandomForestClassifier (or ExtraTreesClassifier).
+
+        Returns:
+            CompiledForest: The flattened ensemble.
+
+        Raises:
+            ValueError: If the model is not a single-output forest classifier.
+        """
+        if not hasattr(model, "estimators_") or getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("Only fitted single-output forest classifiers can be compiled.")
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            is_leaf = tree.children_left == -1
+            own_index = np.arange(offset, offset + n_nodes)
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(np.where(is_leaf, own_index, tree.children_left + offset))
+            rights.append(np.where(is_leaf, own_index, tree.children_right + offset))
+
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.intp),
+            classes=np.asarray(model.classes_),
+            max_depth=int(max_depth),
+            n_features=int(model.n_features_in_),
+        )
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Find the leaf reached by every row in every tree.
+
+        Args:
+            X (np.ndarray): A (n_rows, n_features) feature matrix.
+
+        Returns:
+            np.ndarray: A (n_trees, n_rows) array of global leaf indices.
+        """
+        X = self._validate(X)
+        n_rows = X.shape[0]
+        n_trees = len(self.roots)
+        leaves = np.empty(n_trees * n_rows, dtype=np.intp)
+        is_leaf = self.left == np.arange(len(self.left))
+        chunk = max(1, _CHUNK_ELEMENTS // n_trees)
+
+        flat = X.ravel()
+        for start in range(0, n_rows, chunk):
+            stop = min(start + chunk, n_rows)
+            rows = np.arange(start, stop, dtype=np.intp)
+            # Flat (tree, row) pairs still travelling down; finished pairs drop out.
+            node = np.repeat(self.roots, stop - start)
+            row_offsets = np.tile(rows * self.n_features, n_trees)
+            position = (np.arange(n_trees, dtype=np.intp) * n_rows)[:, np.newaxis] + rows
+            position = position.ravel()
+            while node.size:
+                done = is_leaf.take(node)
+                if done.any():
+                    leaves[position[done]] = node[done]
+                    active = ~done
+                    node, row_offsets, position = node[active], row_offsets[active], position[active]
+                    if not node.size:
+                        break
+                x = flat.take(row_offsets + self.feature.take(node))
+                node = np.where(
+                    x <= self.threshold.take(node), self.left.take(node), self.right.take(node)
+                )
+        return leaves.reshape(n_trees, n_rows)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Average the class distributions of every tree.
+
+        Args:
+            X (np.ndarray): A (n_rows, n_features) feature matrix.
+
+        Returns:
+            np.ndarray: A (n_rows, n_classes) array of probabilities.
+        """
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[1], self.value.shape[1]), dtype=np.float64)
+        for tree_leaves in leaves:
+            proba += self.value[tree_leaves]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict the most probable class of every row.
+
+        Args:
+            X (np.ndarray): A (n_rows, n_features) feature matrix.
+
+        Returns:
+            np.ndarray: The predicted class labels.
+        """
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
+
+    def _validate(self, X: np.ndarray) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected a 2D matrix with {self.n_features} features.")
+        # Like sklearn, checked after the float32 cast, which turns huge values into infinity.
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity.")
+        return X
+
+    def save(self, path: str = COMPILED_MODEL_PATH) -> None:
+        """
+        Write the flattened arrays to an .npz file atomically.
+
+        Args:
+            path (str): The destination of the compiled artifact.
+        """
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            classes=self.classes_,
+            meta=np.array([self.max_depth, self.n_features]),
+            source_version=np.array(self.source_version or ""),
+        )
+        atomic_write_bytes(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path: str = COMPILED_MODEL_PATH) -> "CompiledForest":
+        """
+        Read a compiled artifact written by `save`.
+
+        Args:
+            path (str): The path of the compiled artifact.
+
+        Returns:
+            CompiledForest: The flattened ensemble.
+        """
+        with np.load(path, allow_pickle=False) as arrays:
+            max_depth, n_features = arrays["meta"].tolist()
+            forest = cls(
+                feature=arrays["feature"],
+                threshold=arrays["threshold"],
+                left=arrays["left"],
+                right=arrays["right"],
+                value=arrays["value"],
+                roots=arrays["roots"],
+                classes=arrays["classes"],
+                max_depth=max_depth,
+                n_features=n_features,
+            )
+            forest.source_version = str(arrays["source_version"]) or None
+        return forest
+
+
+def export_forest(model: Any, version: str, path: str = COMPILED_MODEL_PATH) -> CompiledForest:
+    """
+    Compile a freshly trained forest and write it next to the pickled model.
+
+    Args:
+        model: The fitted forest classifier.
+        version (str): The version of the pickled artifact it was compiled from.
+        path (str): The destination of the compiled artifact.
+
+    Returns:
+        CompiledForest: The flattened ensemble.
+    """
+    forest = CompiledForest.from_sklearn(model)
+    forest.source_version = version
+    forest.save(path)
+    return forest
+
+
+def load_or_compile(model: Any, version: str, path: str = COMPILED_MODEL_PATH) -> Optional[CompiledForest]:
+    """
+    Get the compiled form of a model, preferring the exported artifact.
+
+    The exported arrays are only reused when they were compiled from the same
+    model version; otherwise the model is compiled in memory.
+
+    Args:
+        model: The loaded model.
+        version (str): The version of the loaded model.
+        path (str): The path of the compiled artifact.
+
+    Returns:
+        CompiledForest: The flattened ensemble, or None if the model is not a forest.
+    """
+    if os.path.exists(path):
+        try:
+            forest = CompiledForest.load(path)
+            if forest.source_version == version:
+                return forest
+        except (OSError, ValueError, KeyError):
+            pass
+    try:
+        forest = CompiledForest.from_sklearn(model)
+    except ValueError:
+        return None
+    forest.source_version = version
+    return forest
@@ -0,0 +1,191 @@
+import io
+import itertools
+import multiprocessing
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.services.data import STORE_DIR, dataset_store
+from src.services.utils import atomic_write_bytes
+
+DEFAULT_PARAM_GRID = {
+    "n_estimators": [50, 100, 200],
+    "criterion": ["gini", "entropy"],
+    "max_depth": [None, 3, 5],
+}
+TUNING_DIR = os.path.join(STORE_DIR, "tuning")
+TUNING_WORKERS = int(os.getenv("TUNING_WORKERS", "0")) or os.cpu_count()
+
+# In each worker process: the memory-mapped matrices of the latest runs.
+_MAX_CACHED_RUNS = 4
+_matrices: "OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+
+# One pool shared by every tuning run, so concurrent runs queue their fits
+# instead of each starting a pool of os.cpu_count() processes.
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def build_candidates(
+    param_grid: Dict[str, List[Any]],
+    search: str = "grid",
+    n_iter: int = 10,
+    seed: int = 42,
+) -> List[dict]:
+    """
+    Enumerate the parameter sets to evaluate.
+
+    Args:
+        param_grid (dict): Parameter name to list of values.
+        search (str): "grid" for every combination, "random" for a sample.
+        n_iter (int): The number of combinations sampled by random search.
+        seed (int): The random search seed.
+
+    Returns:
+        list: The candidate parameter dictionaries.
+    """
+    names = sorted(param_grid)
+    combinations = [dict(zip(names, values)) for values in itertools.product(*(param_grid[n] for n in names))]
+    if search == "random" and n_iter < len(combinations):
+        return random.Random(seed).sample(combinations, n_iter)
+    return combinations
+
+
+def _load_matrices(x_path: str, y_path: str) -> Tuple[np.ndarray, np.ndarray]:
+    matrices = _matrices.get(x_path)
+    if matrices is None:
+        # Memory-mapped read-only: every worker shares the same page-cache copy.
+        matrices = _matrices[x_path] = (np.load(x_path, mmap_mode="r"), np.load(y_path, mmap_mode="r"))
+        while len(_matrices) > _MAX_CACHED_RUNS:
+            _matrices.popitem(last=False)
+    return matrices
+
+
+def _score_fold(
+    x_path: str, y_path: str, params: dict, seed: int, train_index: np.ndarray, test_index: np.ndarray
+) -> float:
+    from sklearn.ensemble import RandomForestClassifier
+
+    X, y = _load_matrices(x_path, y_path)
+    model = RandomForestClassifier(**{"random_state": seed, **params})
+    model.fit(X[train_index], y[train_index])
+    return float(model.score(X[test_index], y[test_index]))
+
+
+def _shared_executor() -> Executor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=TUNING_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown() -> None:
+    """Stop the shared tuning pool."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def _write_matrix(path: str, array: np.ndarray) -> None:
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    atomic_write_bytes(path, buffer.getvalue())
+
+
+def tune(
+    param_grid: Optional[Dict[str, List[Any]]] = None,
+    search: str = "grid",
+    n_iter: int = 10,
+    cv: int = 5,
+    tolerance: float = 0.05,
+    seed: int = 42,
+    executor: Optional[Executor] = None,
+) -> Dict[str, Any]:
+    """
+    Cross-validate RandomForest candidates in parallel and pick the best one.
+
+    The training split is written once per run as a float32 matrix and
+    memory-mapped by every worker, so it is not pickled into each task. Fits
+    run on a pool of TUNING_WORKERS processes shared by all runs. Folds are evaluated
+    in rounds: after the first two folds, a candidate whose mean accuracy is
+    more than `tolerance` below the best mean is dropped.
+
+    Args:
+        param_grid (dict): Parameter name to list of values.
+        search (str): "grid" or "random".
+        n_iter (int): The number of candidates for random search.
+        cv (int): The number of stratified folds.
+        tolerance (float): How far below the best mean a candidate may fall.
+        seed (int): Seed for the random search and the fold shuffling.
+        executor (Executor): The pool to run fits on; the shared pool by default.
+
+    Returns:
+        dict: The best parameters and score and every candidate's outcome.
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    start = time.perf_counter()
+    candidates = build_candidates(param_grid or DEFAULT_PARAM_GRID, search, n_iter, seed)
+
+    X = np.ascontiguousarray(dataset_store.load("train").to_numpy(), dtype=np.float32)
+    y = dataset_store.load("y_train").squeeze("columns").to_numpy()
+    # Per-run files: concurrent runs never overwrite matrices being read.
+    run_id = uuid.uuid4().hex
+    x_path = os.path.join(TUNING_DIR, f"{run_id}_X.npy")
+    y_path = os.path.join(TUNING_DIR, f"{run_id}_y.npy")
+    executor = executor or _shared_executor()
+
+    folds = list(StratifiedKFold(n_splits=cv, shuffle=True, random_state=seed).split(X, y))
+    scores: List[List[float]] = [[] for _ in candidates]
+    alive = list(range(len(candidates)))
+
+    try:
+        _write_matrix(x_path, X)
+        _write_matrix(y_path, y)
+        for fold_number, (train_index, test_index) in enumerate(folds):
+            futures = {
+                index: executor.submit(
+                    _score_fold, x_path, y_path, candidates[index], seed, train_index, test_index
+                )
+                for index in alive
+            }
+            for index, future in futures.items():
+                scores[index].append(future.result())
+
+            if fold_number >= 1:
+                best_mean = max(np.mean(scores[index]) for index in alive)
+                alive = [index for index in alive if np.mean(scores[index]) >= best_mean - tolerance]
+    finally:
+        for path in (x_path, y_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    results = [
+        {
+            "params": params,
+            "mean_score": round(float(np.mean(fold_scores)), 6),
+            "folds_evaluated": len(fold_scores),
+            "pruned": index not in alive,
+        }
+        for index, (params, fold_scores) in enumerate(zip(candidates, scores))
+    ]
+    best = max((results[index] for index in alive), key=lambda result: result["mean_score"])
+    return {
+        "best_params": best["params"],
+        "best_score": best["mean_score"],
+        "candidates": results,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
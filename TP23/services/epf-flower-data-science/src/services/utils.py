@@ -0,0 +1,91 @@
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Dict, Tuple
+
+_digest_memo: Dict[str, Tuple[tuple, str]] = {}
+_digest_lock = threading.Lock()
+
+# Read once at import: os.umask can only be read by setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 digest of a file without loading it fully in memory.
+
+    Args:
+        path (str): The path of the file.
+        chunk_size (int): The number of bytes read at a time.
+
+    Returns:
+        str: The hexadecimal digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """
+    SHA-256 of a file, only recomputed when its stat signature changes.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        str: The hexadecimal digest of the file content.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    known = _digest_memo.get(path)
+    if known is not None and known[0] == signature:
+        return known[1]
+    digest = file_sha256(path)
+    with _digest_lock:
+        _digest_memo[path] = (signature, digest)
+    return digest
+
+
+def remember_digest(path: str, digest: str) -> None:
+    """
+    Record the digest of a file that was just written, to skip re-hashing it.
+
+    Args:
+        path (str): The path of the file.
+        digest (str): The SHA-256 of the content written.
+    """
+    stat = os.stat(path)
+    with _digest_lock:
+        _digest_memo[path] = ((stat.st_mtime_ns, stat.st_size, stat.st_ino), digest)
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """
+    Write a file atomically: readers either see the old content or the new one.
+
+    Args:
+        path (str): The destination path.
+        data (bytes): The content to write.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # mkstemp creates the file as 0600; give it the mode open() would.
+            os.fchmod(f.fileno(), 0o666 & ~_UMASK)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
@@ -0,0 +1,25 @@
+import os
+import threading
+
+from src.services.log import get_logger
+from src.services.model_registry import model_registry
+
+APP_WARMUP = os.getenv("APP_WARMUP", "1") == "1"
+logger = get_logger("warmup")
+
+
+def warm_up() -> None:
+    """
+    Import the ML stack and load the model, so the first request does not pay for it.
+    """
+    import pandas  # noqa: F401
+    import sklearn.ensemble  # noqa: F401
+
+    if os.path.exists(model_registry.path):
+        model_registry.get()
+    logger.info("Warm-up finished")
+
+
+def start_warm_up() -> None:
+    """Run the warm-up in a background thread; the worker is ready immediately."""
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
@@ -143,3 +143,129 @@ class TestAuthentication:
         response = client.get(f"/v1/limited?user_id=testuser")
         assert response.status_code == 429
         assert response.json()["detail"] == "Rate limit exceeded"
+
+
+class TestListUsers:
+    @pytest.fixture
+    def client(self) -> TestClient:
+        """
+        Test client backed by the in-memory Firestore stand-in.
+        """
+        from firestore import MemoryFirestoreClient
+        from main import get_application
+        from src.api.dependencies.database import get_firestore_client
+
+        database = MemoryFirestoreClient()
+        database.collections["users"] = {
+            f"user{i}@test.com": {"email": f"user{i}@test.com", "name": "User", "role": "user", "password": "hash"}
+            for i in range(5)
+        }
+        database.collections["users"]["admin@test.com"] = {
+            "email": "admin@test.com", "name": "Admin", "role": "admin", "password": "hash"
+        }
+        app = get_application()
+        app.dependency_overrides[get_firestore_client] = lambda: database
+        return TestClient(app, base_url="http://testserver")
+
+    @pytest.fixture
+    def admin_token(self) -> str:
+        from src.services.tokens import token_signer
+
+        return token_signer.issue("admin@test.com", "admin")[0]
+
+    def test_list_users_paginated(self, client, admin_token):
+        """
+        Test that /users pages with a cursor and never returns password hashes.
+        """
+        params = {"token": admin_token, "limit": 4}
+        first = client.get("/v1/users", params=params).json()
+        assert len(first["users"]) == 4
+        assert first["next_cursor"] == first["users"][-1]["id"]
+        assert all("password" not in user["data"] for user in first["users"])
+
+        second = client.get("/v1/users", params={**params, "cursor": first["next_cursor"]}).json()
+        assert len(second["users"]) == 2
+        assert second["next_cursor"] is None
+
+    def test_list_users_streamed(self, client, admin_token, monkeypatch):
+        """
+        Test the streamed /users response across several pages.
+        """
+        from src.api.routes import authentication
+
+        monkeypatch.setattr(authentication, "USERS_PAGE_SIZE", 2)
+        response = client.get("/v1/users", headers={"Authorization": f"Bearer {admin_token}"}, params={"stream": True})
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["users"]) == 6
+        assert body["next_cursor"] is None
+
+    def test_register_batch(self, client, admin_token):
+        """
+        Test the /register/batch endpoint skips existing and duplicate users.
+        """
+        new_user = {"email": "new@test.com", "password": "pass", "name": "New", "role": "user"}
+        existing_user = {"email": "user0@test.com", "password": "pass", "name": "User", "role": "user"}
+        response = client.post(
+            "/v1/register/batch",
+            json={"users": [new_user, existing_user, new_user]},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert response.status_code == 200
+        json_response = response.json()
+        assert json_response["registered"] == ["new@test.com"]
+        assert {entry["reason"] for entry in json_response["skipped"]} == {"User already exists.", "Duplicate in request."}
+
+        response = client.post("/v1/login", params={"email": "new@test.com", "password": "pass"})
+        assert response.status_code == 200
+
+    def test_register_batch_requires_admin(self, client, admin_token):
+        """
+        Test that /register/batch refuses anonymous and non-admin callers, and unknown roles.
+        """
+        from src.services.tokens import token_signer
+
+        batch = {"users": [{"email": "boss@test.com", "password": "pass", "name": "Boss", "role": "admin"}]}
+        assert client.post("/v1/register/batch", json=batch).status_code == 401
+        user_token = token_signer.issue("user0@test.com", "user")[0]
+        response = client.post("/v1/register/batch", json=batch, headers={"Authorization": f"Bearer {user_token}"})
+        assert response.status_code == 403
+
+        batch["users"][0]["role"] = "root"
+        response = client.post("/v1/register/batch", json=batch, headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 422
+
+    def test_role_comes_from_token(self, client):
+        """
+        Test that a non-admin token is refused without looking up the user.
+        """
+        from src.services.tokens import token_signer
+
+        token = token_signer.issue("user0@test.com", "user")[0]
+        response = client.get("/v1/users", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 403
+
+    def test_forged_token(self, client):
+        """
+        Test that the legacy unsigned tokens are rejected.
+        """
+        response = client.get("/v1/users", params={"token": "token-for-admin@test.com"})
+        assert response.status_code == 401
+
+    def test_logout_revokes_token(self, client, admin_token, monkeypatch):
+        """
+        Test that a logged out token is rejected.
+        """
+        from src.api.dependencies import auth
+        from src.api.routes import authentication
+        from src.services.revocation import MemoryRevocationStore
+
+        store = MemoryRevocationStore()
+        monkeypatch.setattr(auth, "revocation_store", store)
+        monkeypatch.setattr(authentication, "revocation_store", store)
+
+        params = {"token": admin_token}
+        assert client.post("/v1/logout", params=params).status_code == 200
+        response = client.get("/v1/users", params=params)
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token has been invalidated."
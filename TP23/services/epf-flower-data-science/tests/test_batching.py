@@ -0,0 +1,69 @@
+import asyncio
+import numpy as np
+from src.services.batching import MicroBatcher
+
+
+class TestMicroBatcher:
+    def test_concurrent_requests_coalesced(self):
+        """
+        Test that concurrent submissions share one call and get their own rows back.
+        """
+        calls = []
+
+        def predict_fn(matrix):
+            calls.append(len(matrix))
+            return matrix[:, 0] * 10, "v1"
+
+        batcher = MicroBatcher(predict_fn, max_batch_size=64, max_wait_ms=50)
+
+        async def run():
+            matrices = [np.full((i + 1, 4), i, dtype=np.float32) for i in range(5)]
+            return await asyncio.gather(*(batcher.submit(m) for m in matrices))
+
+        results = asyncio.run(run())
+
+        assert calls == [15]
+        for i, (rows, version) in enumerate(results):
+            assert version == "v1"
+            assert rows.tolist() == [i * 10.0] * (i + 1)
+
+        stats = batcher.stats()
+        assert stats["batches"] == 1
+        assert stats["requests"] == 5
+        assert stats["batch_size_histogram"]["16"] == 1
+
+    def test_batch_size_limit(self):
+        """
+        Test that a batch never grows past max_batch_size once full.
+        """
+        calls = []
+
+        def predict_fn(matrix):
+            calls.append(len(matrix))
+            return matrix[:, 0], None
+
+        batcher = MicroBatcher(predict_fn, max_batch_size=2, max_wait_ms=50)
+
+        async def run():
+            matrices = [np.zeros((1, 4), dtype=np.float32) for _ in range(4)]
+            return await asyncio.gather(*(batcher.submit(m) for m in matrices))
+
+        asyncio.run(run())
+        assert calls == [2, 2]
+
+    def test_errors_propagated(self):
+        """
+        Test that a failing prediction is raised in every waiting caller.
+        """
+        def predict_fn(matrix):
+            raise ValueError("boom")
+
+        batcher = MicroBatcher(predict_fn, max_wait_ms=1)
+
+        async def run():
+            try:
+                await batcher.submit(np.zeros((1, 4), dtype=np.float32))
+            except ValueError as e:
+                return str(e)
+
+        assert asyncio.run(run()) == "boom"
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from benchmarks.bench_api import BASELINE_PATH, SERVICE_ROOT, compare, percentile_summary, synthetic_iris
+
+# The timing gate is opt-in: RUN_BENCHMARKS=1 runs it against the committed
+# baseline, tolerating a BENCH_THRESHOLD p50 slowdown.
+RUN_BENCHMARKS = os.getenv("RUN_BENCHMARKS") == "1"
+BENCH_THRESHOLD = os.getenv("BENCH_THRESHOLD", "2.0")
+
+
+class TestBenchmarkHarness:
+    def test_synthetic_iris_is_reproducible(self):
+        """
+        Test that the synthetic dataset has the iris shape and is seeded.
+        """
+        data = synthetic_iris(500)
+        assert data["features"].shape == (500, 4)
+        assert set(data["codes"]) == {0, 1, 2}
+        assert (synthetic_iris(500)["features"] == data["features"]).all()
+
+    def test_percentile_summary(self):
+        """
+        Test the throughput and latency percentiles of a run.
+        """
+        summary = percentile_summary([0.001] * 99 + [0.1], wall_time=0.199)
+        assert summary["iterations"] == 100
+        assert summary["throughput_rps"] == pytest.approx(502.51)
+        assert summary["p50_ms"] == pytest.approx(1.0)
+        assert summary["p99_ms"] > 1.0
+
+    def test_compare_flags_regressions_beyond_threshold(self):
+        """
+        Test that only p50 slowdowns beyond the threshold are regressions.
+        """
+        baseline = {"predict_1": {"p50_ms": 2.0}, "login": {"p50_ms": 20.0}, "removed": {"p50_ms": 1.0}}
+        results = {"predict_1": {"p50_ms": 2.3}, "login": {"p50_ms": 25.0}, "new": {"p50_ms": 9.0}}
+        regressions = compare(baseline, results, threshold=0.2)
+        assert [r.scenario for r in regressions] == ["login"]
+        assert regressions[0].change == pytest.approx(0.25)
+
+    @pytest.mark.skipif(not RUN_BENCHMARKS, reason="timing gate; set RUN_BENCHMARKS=1 to run it")
+    def test_quick_run_against_baseline(self):
+        """
+        Test a --quick run end to end, failing on regressions beyond BENCH_THRESHOLD.
+        """
+        assert os.path.exists(BASELINE_PATH)
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_api", "--quick", "--threshold", BENCH_THRESHOLD],
+            cwd=SERVICE_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=600,
+        )
+        assert result.returncode == 0, result.stdout + result.stderr
+        for scenario in ("data_load_10000", "pipeline", "predict_1000", "login"):
+            assert f"\n{scenario} " in result.stdout
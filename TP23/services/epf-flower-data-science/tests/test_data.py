@@ -1,3 +1,4 @@
+import time
 import pytest
 from fastapi.testclient import TestClient
 
@@ -60,6 +61,16 @@ class TestDataRoutes:
         json_response = response.json()
         assert "message" in json_response or "error" in json_response
 
+        # Training runs as a background job; wait for the model to be saved.
+        if "job_id" in json_response:
+            deadline = time.time() + 120
+            job = json_response
+            while job["status"] in ("queued", "running") and time.time() < deadline:
+                time.sleep(0.1)
+                job = client.get(f"/v1/jobs/{json_response['job_id']}").json()
+            assert job["status"] == "succeeded"
+            assert job["finished_at"] is not None
+
     def test_predict(self, client):
         """
         Test the /model/predict endpoint.
@@ -76,3 +87,66 @@ class TestDataRoutes:
             assert isinstance(json_response["predictions"], list)
         else:
             assert "error" in json_response
+
+    def test_predict_batch(self, client):
+        """
+        Test the /model/predict/batch endpoint with columnar input.
+        """
+        mock_data = {
+            "columns": {
+                "SepalLengthCm": [5.1, 6.5],
+                "SepalWidthCm": [3.5, 3.0],
+                "PetalLengthCm": [1.4, 5.5],
+                "PetalWidthCm": [0.2, 1.8],
+            },
+            "proba": True,
+        }
+        response = client.post("/v1/model/predict/batch", json=mock_data)
+        assert response.status_code == 200
+        json_response = response.json()
+        if "error" not in json_response:
+            assert len(json_response["predictions"]) == 2
+            assert len(json_response["labels"]) == 2
+            assert len(json_response["probabilities"]) == 2
+
+    def test_load_dataset_paginated(self, client):
+        """
+        Test the /data/load endpoint with pagination and column projection.
+        """
+        response = client.get("/v1/data/load", params={"offset": 0, "limit": 2, "columns": "Species"})
+        assert response.status_code == 200
+        json_response = response.json()
+        if isinstance(json_response, list):
+            assert len(json_response) == 2
+            assert list(json_response[0]) == ["Species"]
+            assert response.headers["X-Next-Offset"] == "2"
+        else:
+            assert "error" in json_response
+
+    def test_load_dataset_default_page(self, client, monkeypatch):
+        """
+        Test that JSON loads without a limit return a bounded page, and that limits are capped.
+        """
+        from src.api.routes import data
+
+        monkeypatch.setattr(data, "DATASET_PAGE_SIZE", 100)
+        monkeypatch.setattr(data, "DATASET_MAX_PAGE_SIZE", 120)
+        response = client.get("/v1/data/load")
+        json_response = response.json()
+        if isinstance(json_response, list):
+            assert len(json_response) == 100
+            assert response.headers["X-Next-Offset"] == "100"
+            capped = client.get("/v1/data/load", params={"limit": 1000})
+            assert len(capped.json()) == 120
+            assert capped.headers["X-Next-Offset"] == "120"
+        else:
+            assert "error" in json_response
+
+    def test_load_dataset_ndjson(self, client):
+        """
+        Test the /data/load endpoint in streaming NDJSON mode.
+        """
+        response = client.get("/v1/data/load", params={"limit": 3, "format": "ndjson"})
+        assert response.status_code == 200
+        if response.headers["content-type"].startswith("application/x-ndjson"):
+            assert len(response.text.splitlines()) == 3
@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+from src.services.data import DatasetStore, iter_csv, iter_dataset_chunks, iter_ndjson, read_dataset_page
+
+
+class TestDatasetReader:
+    @pytest.fixture
+    def csv_path(self, tmp_path) -> str:
+        """
+        CSV file with 25 numbered rows.
+        """
+        path = tmp_path / "data.csv"
+        pd.DataFrame({"Id": range(25), "Value": [i * 0.5 for i in range(25)]}).to_csv(path, index=False)
+        return str(path)
+
+    def test_chunks_bounded(self, csv_path):
+        """
+        Test that the window is returned in chunks no larger than chunk_size.
+        """
+        chunks = list(iter_dataset_chunks(csv_path, offset=3, limit=12, chunk_size=5))
+        assert all(len(chunk) <= 5 for chunk in chunks)
+        assert pd.concat(chunks)["Id"].tolist() == list(range(3, 15))
+
+    def test_page_projection(self, csv_path):
+        """
+        Test reading one page with a column projection.
+        """
+        page = read_dataset_page(csv_path, offset=20, limit=10, columns=["Value"])
+        assert list(page.columns) == ["Value"]
+        assert page["Value"].tolist() == [10.0, 10.5, 11.0, 11.5, 12.0]
+
+        assert read_dataset_page(csv_path, offset=100).empty
+
+    def test_streaming_encoders(self, csv_path):
+        """
+        Test the NDJSON and CSV encoders.
+        """
+        chunks = lambda: iter_dataset_chunks(csv_path, limit=4, chunk_size=3)
+        lines = b"".join(iter_ndjson(chunks())).decode().splitlines()
+        assert lines[0] == '{"Id":0,"Value":0.0}'
+        assert len(lines) == 4
+
+        csv_text = b"".join(iter_csv(chunks())).decode()
+        assert csv_text.splitlines() == ["Id,Value", "0,0.0", "1,0.5", "2,1.0", "3,1.5"]
+
+
+class TestDatasetStore:
+    @pytest.fixture
+    def store(self, tmp_path) -> DatasetStore:
+        """
+        Dataset store inside a temporary directory.
+        """
+        return DatasetStore(str(tmp_path / "store"), max_entries=2)
+
+    def test_round_trip(self, store):
+        """
+        Test that numeric and string columns survive a save/load from disk.
+        """
+        frame = pd.DataFrame({"x": [1.5, 2.5], "code": [0, 1], "label": ["a", "bc"]}, index=[7, 3])
+        store.save("frame", frame)
+
+        reloaded = DatasetStore(store.directory).load("frame")
+        assert reloaded["x"].tolist() == [1.5, 2.5]
+        assert reloaded["code"].tolist() == [0, 1]
+        assert reloaded["label"].tolist() == ["a", "bc"]
+
+    def test_cached_by_content(self, store):
+        """
+        Test that a saved frame is served from the cache until the file changes.
+        """
+        store.save("frame", pd.DataFrame({"x": [1, 2]}))
+        first = store.load("frame")
+        assert store.load("frame") is first
+        assert store.hits == 2 and store.misses == 0
+
+        other = DatasetStore(store.directory)
+        other.save("frame", pd.DataFrame({"x": [3]}))
+        assert store.load("frame")["x"].tolist() == [3]
+        assert store.misses == 1
+
+    def test_lru_eviction(self, store):
+        """
+        Test that the cache keeps at most max_entries frames.
+        """
+        for i in range(3):
+            store.save(f"frame{i}", pd.DataFrame({"x": [i]}))
+        store.load("frame0")
+        assert store.misses == 1
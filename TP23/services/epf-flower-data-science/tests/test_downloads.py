@@ -0,0 +1,116 @@
+import time
+import zipfile
+
+import pytest
+from src.services.downloads import ChecksumMismatch, DownloadManager, LocalArchiveSource
+from src.services.utils import file_sha256
+
+IRIS_CSV = "Id,SepalLengthCm,SepalWidthCm,PetalLengthCm,PetalWidthCm,Species\n1,5.1,3.5,1.4,0.2,Iris-setosa\n"
+
+
+class CountingSource(LocalArchiveSource):
+    def __init__(self, path: str, chunk_size: int = 1 << 20) -> None:
+        super().__init__(path, chunk_size)
+        self.fetches = 0
+
+    def fetch(self, slug, version, destination, progress):
+        self.fetches += 1
+        super().fetch(slug, version, destination, progress)
+
+
+class TestDownloadManager:
+    @pytest.fixture
+    def archive(self, tmp_path):
+        path = tmp_path / "iris.zip"
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("Iris.csv", IRIS_CSV)
+            zf.writestr("database.sqlite", b"not extracted")
+        return str(path)
+
+    @pytest.fixture
+    def manager(self, archive, tmp_path):
+        return DownloadManager(CountingSource(archive), cache_dir=str(tmp_path / "cache"))
+
+    def test_download_is_cached_and_extracted_once(self, manager, archive, tmp_path):
+        """
+        Test that the second download neither fetches nor extracts again.
+        """
+        data_dir = tmp_path / "data"
+        first = manager.download("uciml/iris", "2", str(data_dir))
+        assert first["cached"] is False and first["extracted"] is True
+        assert first["sha256"] == file_sha256(archive)
+        assert (data_dir / "iris.csv").read_text() == IRIS_CSV
+        assert not (data_dir / "database.sqlite").exists()
+
+        second = manager.download("uciml/iris", "2", str(data_dir))
+        assert second["cached"] is True and second["extracted"] is False
+        assert manager.source.fetches == 1
+
+        # A modified data file is restored from the cached archive.
+        (data_dir / "iris.csv").write_text("edited")
+        third = manager.download("uciml/iris", "2", str(data_dir))
+        assert third["cached"] is True and third["extracted"] is True
+        assert (data_dir / "iris.csv").read_text() == IRIS_CSV
+        assert manager.source.fetches == 1
+
+    def test_latest_expires_and_corruption_refetches(self, manager, tmp_path):
+        """
+        Test that a stale "latest" archive or a corrupted cached one is fetched again.
+        """
+        data_dir = str(tmp_path / "data")
+        manager.download("uciml/iris", "latest", data_dir)
+        manager.max_age = 0
+        time.sleep(0.01)
+        assert manager.download("uciml/iris", "latest", data_dir)["cached"] is False
+
+        manager.max_age = 3600
+        cached_archive, _ = manager._paths("uciml/iris", "latest")
+        with open(cached_archive, "ab") as f:
+            f.write(b"garbage")
+        assert manager.download("uciml/iris", "latest", data_dir)["cached"] is False
+        assert manager.source.fetches == 3
+
+    def test_checksum_mismatch_keeps_existing_data(self, manager, tmp_path):
+        """
+        Test that an archive with the wrong SHA-256 is rejected before extraction.
+        """
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        (data_dir / "iris.csv").write_text("previous")
+        with pytest.raises(ChecksumMismatch):
+            manager.download("uciml/iris", "2", str(data_dir), expected_sha256="0" * 64)
+        assert (data_dir / "iris.csv").read_text() == "previous"
+        assert manager._cached_manifest("uciml/iris", "2") is None
+
+    def test_interrupted_copy_resumes(self, archive, tmp_path):
+        """
+        Test that the local source continues an interrupted copy from its .part file.
+        """
+        destination = str(tmp_path / "archive.zip")
+        with open(archive, "rb") as f:
+            payload = f.read()
+        with open(destination + ".part", "wb") as f:
+            f.write(payload[:10])
+
+        progress = []
+        LocalArchiveSource(archive, chunk_size=64).fetch("uciml/iris", "2", destination, lambda d, t: progress.append(d))
+        with open(destination, "rb") as f:
+            assert f.read() == payload
+        assert progress[0] == min(10 + 64, len(payload))
+        assert progress[-1] == len(payload)
+
+    def test_background_download_reports_progress(self, manager, tmp_path):
+        """
+        Test that a background download can be polled until it succeeds.
+        """
+        task, created = manager.start("uciml/iris", "2", destination=str(tmp_path / "data"))
+        assert created
+        for _ in range(500):
+            if task.status in ("succeeded", "failed"):
+                break
+            time.sleep(0.01)
+        summary = manager.get(task.id).describe()
+        assert summary["status"] == "succeeded"
+        assert summary["stage"] == "done"
+        assert summary["bytes_done"] == summary["bytes_total"] > 0
+        assert summary["result"]["extracted"] is True
@@ -1,6 +1,12 @@
+import asyncio
+import grpc
 import pytest
 from unittest.mock import MagicMock
-from firestore import FirestoreClient
+from fastapi.testclient import TestClient
+from google.api_core.exceptions import NotFound
+from google.auth.credentials import AnonymousCredentials
+from firestore import AsyncFirestoreClient, FirestoreClient, MemoryFirestoreClient
+from src.services.cache import TTLCache
 
 
 class TestFirestoreClient:
@@ -13,6 +19,58 @@ class TestFirestoreClient:
         client.client = MagicMock() 
         return client
 
+    def test_connects_lazily(self, monkeypatch):
+        """
+        Test that credentials are only loaded when the client is first used.
+        """
+        monkeypatch.setenv("FIRESTORE_KEY_PATH", "missing_key.json")
+        client = FirestoreClient()
+        with pytest.raises(FileNotFoundError):
+            client.get("test_collection", "test_document")
+
+    def test_shared_client(self):
+        """
+        Test that the dependency provides one client per process.
+        """
+        from src.api.dependencies.database import get_firestore_client
+
+        assert get_firestore_client() is get_firestore_client()
+
+    def test_close_shuts_the_channel(self):
+        """
+        Test that close shuts the gRPC channel, not only the HTTP session.
+        """
+        from google.cloud import firestore
+
+        client = FirestoreClient()
+        client.client = firestore.Client(project="test", credentials=AnonymousCredentials())
+        client.client._firestore_api
+        channel = client.client._transport.grpc_channel
+        client.close()
+        with pytest.raises(ValueError, match="closed channel"):
+            channel.unary_unary("/test")(b"")
+
+    def test_shutdown_closes_the_async_channel(self, monkeypatch):
+        """
+        Test that the application's shutdown handler closes the shared client's channel.
+        """
+        from google.cloud import firestore
+        from main import get_application
+        from src.api.dependencies import database
+
+        client = AsyncFirestoreClient()
+        client.client = firestore.AsyncClient(project="test", credentials=AnonymousCredentials())
+        monkeypatch.setattr(database, "firestore_client", client)
+
+        async def open_channel():
+            client.client._firestore_api
+            return client.client._transport.grpc_channel
+
+        with TestClient(get_application()) as test_client:
+            channel = test_client.portal.call(open_channel)
+            assert channel.get_state() != grpc.ChannelConnectivity.SHUTDOWN
+        assert channel.get_state() == grpc.ChannelConnectivity.SHUTDOWN
+
     def test_get_document_found(self, firestore_client):
         """
         Test FirestoreClient.get() when the document is found.
@@ -69,3 +127,165 @@ class TestFirestoreClient:
         assert len(result) == 2
         assert result[0].id == "doc1"
         assert result[1].id == "doc2"
+
+    def test_list_documents_page(self, firestore_client):
+        """
+        Test that a page is ordered by document ID, starts after the cursor and is projected.
+        """
+        collection = firestore_client.client.collection.return_value
+        firestore_client.list_all_documents("test_collection", limit=10, start_after="doc1", fields=["name"])
+        collection.select.assert_called_with(["name"])
+        query = collection.select.return_value.order_by
+        query.assert_called_with("__name__")
+        query.return_value.start_after.assert_called_with({"__name__": "doc1"})
+        query.return_value.start_after.return_value.limit.assert_called_with(10)
+
+
+class TestFirestoreClientCache:
+    @pytest.fixture
+    def clock(self):
+        return [0.0]
+
+    @pytest.fixture
+    def firestore_client(self, clock):
+        """
+        Create a FirestoreClient caching "users" for 10 seconds on a fake clock.
+        """
+        client = FirestoreClient(cache_ttls={"users": 10})
+        client.client = MagicMock()
+        client.cache = TTLCache(max_entries=2, clock=lambda: clock[0])
+        mock_doc = MagicMock()
+        mock_doc.exists = True
+        mock_doc.to_dict.return_value = {"role": "admin"}
+        client.client.collection.return_value.document.return_value.get.return_value = mock_doc
+        return client
+
+    def _reads(self, firestore_client):
+        return firestore_client.client.collection.return_value.document.return_value.get.call_count
+
+    def test_repeated_get_is_cached(self, firestore_client, clock):
+        """
+        Test that a second get is served from the cache until the TTL expires.
+        """
+        assert firestore_client.get("users", "a@b.c") == {"role": "admin"}
+        assert firestore_client.get("users", "a@b.c") == {"role": "admin"}
+        assert self._reads(firestore_client) == 1
+        assert firestore_client.cache_stats()["hits"] == 1
+
+        clock[0] = 11
+        firestore_client.get("users", "a@b.c")
+        assert self._reads(firestore_client) == 2
+
+    def test_uncached_collection(self, firestore_client):
+        """
+        Test that collections without a TTL always hit the database.
+        """
+        firestore_client.get("other", "doc")
+        firestore_client.get("other", "doc")
+        assert self._reads(firestore_client) == 2
+
+    def test_writes_keep_cache_consistent(self, firestore_client):
+        """
+        Test that create writes through and update invalidates.
+        """
+        firestore_client.create("users", "x@y.z", {"role": "user"})
+        assert firestore_client.get("users", "x@y.z") == {"role": "user"}
+        assert self._reads(firestore_client) == 0
+
+        firestore_client.update("users", "x@y.z", {"role": "admin"})
+        assert firestore_client.get("users", "x@y.z") == {"role": "admin"}
+        assert self._reads(firestore_client) == 1
+
+    def test_missing_documents_are_cached_briefly(self, firestore_client, clock, monkeypatch):
+        """
+        Test that a missing document is read again once the short negative TTL expires.
+        """
+        import firestore
+
+        get = firestore_client.client.collection.return_value.document.return_value.get
+        get.return_value.exists = False
+        firestore_client.get("users", "new@b.c")
+        firestore_client.get("users", "new@b.c")
+        assert self._reads(firestore_client) == 2
+
+        monkeypatch.setattr(firestore, "NEGATIVE_CACHE_TTL", 2)
+        firestore_client.get("users", "late@b.c")
+        firestore_client.get("users", "late@b.c")
+        assert self._reads(firestore_client) == 3
+        clock[0] = 3
+        get.return_value.exists = True
+        assert firestore_client.get("users", "late@b.c") == {"role": "admin"}
+
+    def test_lru_eviction(self, firestore_client):
+        """
+        Test that the least recently used document is evicted first.
+        """
+        for email in ("a", "b", "a", "c", "a", "b"):
+            firestore_client.get("users", email)
+        assert self._reads(firestore_client) == 4
+
+
+class TestMemoryFirestoreClient:
+    @pytest.fixture
+    def firestore_client(self):
+        return MemoryFirestoreClient()
+
+    def test_round_trip(self, firestore_client):
+        """
+        Test create, get, update and listing against the in-memory backend.
+        """
+        async def scenario():
+            assert await firestore_client.get("users", "a@b.c") is None
+            await firestore_client.create("users", "a@b.c", {"role": "user", "meta": {"n": 1}})
+            await firestore_client.update("users", "a@b.c", {"role": "admin", "meta.n": 2})
+            document = await firestore_client.get("users", "a@b.c")
+            listed = [(doc.id, doc.to_dict()) async for doc in firestore_client.list_all_documents("users")]
+            return document, listed
+
+        document, listed = asyncio.run(scenario())
+        assert document == {"role": "admin", "meta": {"n": 2}}
+        assert listed == [("a@b.c", document)]
+
+    def test_update_missing_document(self, firestore_client):
+        """
+        Test that updating a missing document fails like Firestore does.
+        """
+        with pytest.raises(NotFound):
+            asyncio.run(firestore_client.update("users", "missing", {"role": "admin"}))
+
+    def test_paginated_projection(self, firestore_client):
+        """
+        Test cursor pagination in document ID order with field projection.
+        """
+        async def scenario():
+            for document_id in ("c", "a", "b"):
+                await firestore_client.create("users", document_id, {"role": "user", "password": "hash"})
+            listing = firestore_client.list_all_documents("users", limit=2, start_after="a", fields=["role"])
+            return [(doc.id, doc.to_dict()) async for doc in listing]
+
+        assert asyncio.run(scenario()) == [("b", {"role": "user"}), ("c", {"role": "user"})]
+
+    def test_batched_reads_and_writes(self, firestore_client, monkeypatch):
+        """
+        Test the batch APIs across several chunks.
+        """
+        import firestore
+
+        monkeypatch.setattr(firestore, "MAX_BATCH_READS", 2)
+        monkeypatch.setattr(firestore, "MAX_BATCH_WRITES", 2)
+
+        async def scenario():
+            await firestore_client.create_many("users", {f"u{i}": {"n": i} for i in range(5)})
+            await firestore_client.update_many("users", {"u1": {"n": 10}, "u4": {"n": 40}})
+            return await firestore_client.get_many("users", ["u0", "u1", "u4", "missing"])
+
+        assert asyncio.run(scenario()) == {"u0": {"n": 0}, "u1": {"n": 10}, "u4": {"n": 40}, "missing": None}
+
+    def test_update_many_is_atomic_per_batch(self, firestore_client):
+        """
+        Test that a batch with a missing document writes nothing.
+        """
+        asyncio.run(firestore_client.create("users", "a", {"n": 1}))
+        with pytest.raises(NotFound):
+            asyncio.run(firestore_client.update_many("users", {"a": {"n": 2}, "missing": {"n": 3}}))
+        assert firestore_client.collections["users"]["a"] == {"n": 1}
@@ -0,0 +1,120 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from src.api import http_cache
+from src.api.http_cache import cached_response, negotiate_encoding
+
+
+class TestHttpCache:
+    @pytest.fixture
+    def client(self) -> TestClient:
+        """
+        Test client for integration tests
+        """
+        from main import get_application
+
+        app = get_application()
+        return TestClient(app, base_url="http://testserver")
+
+    def test_negotiate_encoding(self, monkeypatch):
+        """
+        Test Accept-Encoding negotiation with q-values, wildcards and zstd availability.
+        """
+        monkeypatch.setattr(http_cache, "_zstd_available", lambda: True)
+        assert negotiate_encoding(None) == "identity"
+        assert negotiate_encoding("gzip, deflate, br, zstd") == "zstd"
+        assert negotiate_encoding("zstd;q=0.5, gzip") == "gzip"
+        assert negotiate_encoding("gzip;q=0, br") == "identity"
+        assert negotiate_encoding("*") == "zstd"
+
+        monkeypatch.setattr(http_cache, "_zstd_available", lambda: False)
+        assert negotiate_encoding("zstd, gzip;q=0.1") == "gzip"
+
+    def test_bodies_rendered_and_compressed_once(self):
+        """
+        Test that repeated requests reuse the cached encoded body and honour If-None-Match.
+        """
+        renders = []
+        app = FastAPI()
+
+        @app.get("/doc")
+        def doc(request: Request):
+            def render():
+                renders.append(1)
+                return b"x" * 4096, {"X-Rows": "1"}
+
+            return cached_response(request, "doc", 'W/"v1"', render, last_modified=1_700_000_000)
+
+        client = TestClient(app)
+        for _ in range(2):
+            response = client.get("/doc", headers={"Accept-Encoding": "gzip"})
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.headers["x-rows"] == "1"
+            assert response.content == b"x" * 4096
+        identity = client.get("/doc", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in identity.headers
+        assert renders == [1]
+
+        assert client.get("/doc", headers={"If-None-Match": 'W/"v1"'}).status_code == 304
+        assert client.get("/doc", headers={"If-None-Match": 'W/"v0"'}).status_code == 200
+        last_modified = identity.headers["last-modified"]
+        assert client.get("/doc", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    def test_large_bodies_are_not_cached(self, monkeypatch):
+        """
+        Test that bodies over RESPONSE_CACHE_MAX_BODY_BYTES are rendered per request.
+        """
+        monkeypatch.setattr(http_cache, "RESPONSE_CACHE_MAX_BODY_BYTES", 2048)
+        renders = []
+        app = FastAPI()
+
+        @app.get("/doc")
+        def doc(request: Request):
+            def render():
+                renders.append(1)
+                return bytes(range(256)) * 16, {}
+
+            return cached_response(request, "large-doc", 'W/"v1"', render)
+
+        client = TestClient(app)
+        for _ in range(2):
+            assert client.get("/doc", headers={"Accept-Encoding": "identity"}).content == bytes(range(256)) * 16
+        assert renders == [1, 1]
+
+        # The gzip body compresses under the limit, so it is kept.
+        response = client.get("/doc", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        client.get("/doc", headers={"Accept-Encoding": "gzip"})
+        assert renders == [1, 1, 1]
+
+    def test_dataset_conditional_get(self, client):
+        """
+        Test that /data/load returns 304 while the dataset file is unchanged.
+        """
+        response = client.get("/v1/data/load", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 150
+
+        etag = response.headers["etag"]
+        cached = client.get("/v1/data/load", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        assert client.get("/v1/data/load?limit=5", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_gzip_body_is_deterministic(self):
+        """
+        Test that compressed bodies do not embed a timestamp.
+        """
+        assert http_cache._compress(b"data", "gzip") == http_cache._compress(b"data", "gzip")
+        assert gzip.decompress(http_cache._compress(b"data", "gzip")) == b"data"
+
+    def test_zstd_round_trip(self):
+        """
+        Test that zstd bodies decompress to the original.
+        """
+        import zstandard
+
+        assert zstandard.ZstdDecompressor().decompress(http_cache._compress(b"data" * 100, "zstd")) == b"data" * 100
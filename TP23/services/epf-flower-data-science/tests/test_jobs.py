@@ -0,0 +1,106 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi.testclient import TestClient
+from src.services.jobs import JobManager
+
+
+def _wait(job, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while job.status in ("queued", "running") and time.time() < deadline:
+        time.sleep(0.05)
+    return job.status
+
+
+class TestJobManager:
+    @pytest.fixture
+    def manager(self):
+        """
+        Job manager with a single worker process.
+        """
+        manager = JobManager(max_workers=1)
+        yield manager
+        manager.shutdown()
+
+    def test_job_result(self, manager):
+        """
+        Test that a job runs in the pool and reports its result.
+        """
+        results = []
+        job, created = manager.submit("sqrt", math.sqrt, 16.0, on_success=results.append)
+        assert created
+        assert _wait(job) == "succeeded"
+        assert job.future.result() == 4.0
+        assert manager.get(job.id) is job
+        assert job.describe()["finished_at"] is not None
+        assert results == [4.0]
+
+    def test_succeeded_only_after_callback(self):
+        """
+        Test that a job reports "succeeded" only once its success callback has run.
+        """
+        manager = JobManager(executor_factory=lambda: ThreadPoolExecutor(max_workers=1))
+        start, release = threading.Event(), threading.Event()
+        job, _ = manager.submit("wait", start.wait, 5, on_success=lambda _: release.wait(5))
+        start.set()
+        job.future.result()
+        assert job.status == "running"
+        assert job.describe()["finished_at"] is None
+        release.set()
+        assert job.finished.wait(5)
+        assert job.status == "succeeded"
+        manager.shutdown()
+
+    def test_failing_callback_fails_job(self):
+        """
+        Test that an exception in the success callback marks the job as failed.
+        """
+        manager = JobManager(executor_factory=lambda: ThreadPoolExecutor(max_workers=1))
+        job, _ = manager.submit("sqrt", math.sqrt, 16.0, on_success=lambda _: 1 / 0)
+        assert _wait(job) == "failed"
+        assert "division by zero" in job.describe()["error"]
+        manager.shutdown()
+
+    def test_identical_jobs_deduplicated(self, manager):
+        """
+        Test that a job with the key of a running job is not started twice.
+        """
+        first, created = manager.submit("sleep", time.sleep, 0.5, key="same")
+        second, created_again = manager.submit("sleep", time.sleep, 0.5, key="same")
+        assert created and not created_again
+        assert second is first
+
+        _wait(first)
+        third, created = manager.submit("sleep", time.sleep, 0, key="same")
+        assert created and third is not first
+
+    def test_failed_job(self, manager):
+        """
+        Test that an exception in the worker marks the job as failed.
+        """
+        job, _ = manager.submit("sqrt", math.sqrt, -1.0)
+        assert _wait(job) == "failed"
+        assert job.describe()["error"] == "math domain error"
+
+
+class TestJobRoutes:
+    @pytest.fixture
+    def client(self) -> TestClient:
+        """
+        Test client for integration tests
+        """
+        from main import get_application
+
+        app = get_application()
+        client = TestClient(app, base_url="http://testserver")
+        return client
+
+    def test_unknown_job(self, client):
+        """
+        Test the /jobs/{job_id} endpoint with an unknown id.
+        """
+        response = client.get("/v1/jobs/unknown")
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Job not found."
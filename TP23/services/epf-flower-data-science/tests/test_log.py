@@ -0,0 +1,43 @@
+import logging
+from src.services import log
+from src.services.log import LazyRepr, SamplingFilter, log_payload
+
+
+class TestLogging:
+    def test_sampling_filter(self):
+        """
+        Test that sampling drops debug records but keeps warnings.
+        """
+        sampler = SamplingFilter(0.0)
+        debug = logging.LogRecord("epf.test", logging.DEBUG, __file__, 1, "msg", None, None)
+        warning = logging.LogRecord("epf.test", logging.WARNING, __file__, 1, "msg", None, None)
+        assert not sampler.filter(debug)
+        assert sampler.filter(warning)
+
+    def test_lazy_repr_deferred(self):
+        """
+        Test that the payload is only built when the record is formatted.
+        """
+        calls = []
+        payload = LazyRepr(lambda: calls.append(1) or "payload")
+        record = logging.LogRecord("epf.test", logging.DEBUG, __file__, 1, "data: %s", (payload,), None)
+        assert calls == []
+        assert record.getMessage() == "data: payload"
+        assert calls == [1]
+
+    def test_payload_logging_disabled(self, monkeypatch, caplog):
+        """
+        Test that payloads are never built when payload logging is disabled.
+        """
+        logger = logging.getLogger("epf.test_payload")
+        logger.setLevel(logging.DEBUG)
+        calls = []
+
+        monkeypatch.setattr(log, "LOG_PAYLOADS", False)
+        log_payload(logger, "data: %s", lambda: calls.append(1))
+        assert calls == []
+
+        monkeypatch.setattr(log, "LOG_PAYLOADS", True)
+        with caplog.at_level(logging.DEBUG, logger="epf.test_payload"):
+            log_payload(logger, "data: %s", lambda: "payload")
+        assert "data: payload" in caplog.text
@@ -0,0 +1,78 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.api.middleware import MetricsMiddleware
+from src.services.metrics import Histogram, Metrics
+
+
+class TestMetrics:
+    @pytest.fixture
+    def client(self) -> TestClient:
+        """
+        Test client for integration tests
+        """
+        from main import get_application
+
+        app = get_application()
+        return TestClient(app, base_url="http://testserver")
+
+    def test_histogram_exposition(self):
+        """
+        Test that buckets are cumulative and rendered with sum and count.
+        """
+        histogram = Histogram("latency_seconds", "Latency.", ("route",), (0.1, 1.0))
+        histogram.observe(0.05, "/a")
+        histogram.observe(0.5, "/a")
+        histogram.observe(5.0, "/a")
+        lines = list(histogram.collect())
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+        assert 'latency_seconds_count{route="/a"} 3' in lines
+
+    def test_disabled_spans_record_nothing(self):
+        """
+        Test that spans are no-ops when metrics are disabled.
+        """
+        metrics = Metrics(enabled=False)
+        with metrics.span("predict"):
+            pass
+        assert "span=" not in metrics.render()
+
+        metrics.enabled = True
+        with metrics.span("predict"):
+            pass
+        assert 'span_duration_seconds_count{span="predict"} 1' in metrics.render()
+
+    def test_middleware_labels_route_template(self):
+        """
+        Test that requests are recorded under their route template, with size and status.
+        """
+        metrics = Metrics(enabled=True)
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+        @app.get("/items/{item_id}")
+        def get_item(item_id: int):
+            return {"id": item_id}
+
+        client = TestClient(app)
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/missing")
+
+        exposition = metrics.render()
+        assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="200"} 2' in exposition
+        assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"} 1' in exposition
+        assert 'http_response_size_bytes_sum{method="GET",route="/items/{item_id}"} 16' in exposition
+        assert "http_requests_in_flight 0" in exposition
+
+    def test_metrics_endpoint(self, client):
+        """
+        Test that the application exports its metrics.
+        """
+        client.get("/v1/password/stats")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'route="/v1/password/stats"' in response.text
@@ -0,0 +1,57 @@
+import os
+import pytest
+from src.services.model_registry import ModelRegistry, save_model
+
+
+class TestModelRegistry:
+    @pytest.fixture
+    def model_path(self, tmp_path) -> str:
+        """
+        Path of a model artifact inside a temporary directory.
+        """
+        path = str(tmp_path / "model.pkl")
+        save_model({"name": "first"}, path)
+        return path
+
+    def test_model_loaded_once(self, model_path):
+        """
+        Test that repeated lookups reuse the deserialized model.
+        """
+        registry = ModelRegistry(model_path)
+        first = registry.get()
+        second = registry.get()
+        assert first.model == {"name": "first"}
+        assert first.model is second.model
+        assert first.version == second.version
+
+    def test_model_hot_swapped(self, model_path):
+        """
+        Test that a new artifact replaces the served model and its version.
+        """
+        registry = ModelRegistry(model_path)
+        first = registry.get()
+
+        version = save_model({"name": "second"}, model_path)
+        stat = os.stat(model_path)
+        os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        second = registry.get()
+        assert second.model == {"name": "second"}
+        assert second.version == version
+        assert second.version != first.version
+
+    def test_missing_model(self, tmp_path):
+        """
+        Test that a missing artifact raises FileNotFoundError.
+        """
+        registry = ModelRegistry(str(tmp_path / "missing.pkl"))
+        with pytest.raises(FileNotFoundError):
+            registry.get()
+
+    def test_artifact_is_world_readable(self, model_path):
+        """
+        Test that the atomically written artifact gets the umask's mode, not mkstemp's 0600.
+        """
+        umask = os.umask(0)
+        os.umask(umask)
+        assert os.stat(model_path).st_mode & 0o777 == 0o666 & ~umask
@@ -48,3 +48,13 @@ class TestFirestoreParameters:
         json_response = response.json()
         assert "message" in json_response
         assert json_response["message"] == "Parameters updated successfully."
+
+    def test_retrieve_parameters_conditional(self, client):
+        """
+        Test that /firestore/retrieve answers 304 to a matching ETag.
+        """
+        client.post("/v1/firestore/create")
+        response = client.get("/v1/firestore/retrieve")
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert client.get("/v1/firestore/retrieve", headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.services.passwords import HasherBusy, PasswordHasher
+
+
+class TestPasswordHasher:
+    def test_hash_and_verify(self):
+        """
+        Test a hash round trip on the process pool.
+        """
+        hasher = PasswordHasher(max_workers=1, rounds=4)
+
+        async def scenario():
+            hashed = await hasher.hash("secret")
+            return await hasher.verify("secret", hashed), await hasher.verify("wrong", hashed)
+
+        try:
+            assert asyncio.run(scenario()) == ((True, None), (False, None))
+        finally:
+            hasher.shutdown()
+        stats = hasher.stats()
+        assert stats["hash"]["count"] == 1
+        assert stats["verify"]["count"] == 2
+        assert stats["in_flight"] == 0
+
+    def test_rehash_when_cost_changes(self):
+        """
+        Test that verify returns a new hash when the bcrypt cost was raised.
+        """
+        old = PasswordHasher(rounds=4, executor_factory=ThreadPoolExecutor)
+        new = PasswordHasher(rounds=5, executor_factory=ThreadPoolExecutor)
+
+        async def scenario():
+            hashed = await old.hash("secret")
+            return await new.verify("secret", hashed)
+
+        valid, new_hash = asyncio.run(scenario())
+        assert valid
+        assert new_hash is not None and "$05$" in new_hash
+        assert new.stats()["rehashed"] == 1
+
+    def test_rejects_when_queue_full(self, monkeypatch):
+        """
+        Test the back-pressure once every worker and queue slot is taken.
+        """
+        from src.services import passwords
+
+        release = threading.Event()
+        monkeypatch.setattr(passwords, "_hash", lambda password, rounds: release.wait() and "hash")
+        hasher = PasswordHasher(max_workers=1, max_queue=1, rounds=4, executor_factory=lambda: ThreadPoolExecutor(1))
+
+        async def scenario():
+            pending = [asyncio.ensure_future(hasher.hash("a")), asyncio.ensure_future(hasher.hash("b"))]
+            await asyncio.sleep(0)
+            with pytest.raises(HasherBusy):
+                await hasher.hash("c")
+            assert hasher.stats()["queue_depth"] == 1
+            release.set()
+            return await asyncio.gather(*pending)
+
+        assert asyncio.run(scenario()) == ["hash", "hash"]
+        assert hasher.stats()["rejected"] == 1
+
+    def test_bulk_hashing_leaves_slots_for_logins(self, monkeypatch):
+        """
+        Test that a bulk call holds one slot, rejects a second bulk call and lets logins in.
+        """
+        from src.services import passwords
+
+        release = threading.Event()
+        monkeypatch.setattr(passwords, "_hash", lambda password, rounds: release.wait() and password)
+        hasher = PasswordHasher(
+            max_workers=2, max_queue=0, rounds=4, executor_factory=lambda: ThreadPoolExecutor(2), bulk_workers=1
+        )
+
+        async def scenario():
+            bulk = asyncio.ensure_future(hasher.hash_many(["a", "b", "c"]))
+            login = None
+            try:
+                await asyncio.sleep(0.05)
+                assert hasher.in_flight == 1
+                with pytest.raises(HasherBusy):
+                    await hasher.hash_many(["d"])
+                login = asyncio.ensure_future(hasher.hash("e"))
+                await asyncio.sleep(0.05)
+                assert hasher.in_flight == 2
+            finally:
+                release.set()
+            return await bulk, await login
+
+        assert asyncio.run(scenario()) == (["a", "b", "c"], "e")
@@ -0,0 +1,98 @@
+import pytest
+from fastapi.testclient import TestClient
+from src.services.pipeline import PipelineStep, run_pipeline
+from src.services.utils import file_digest
+
+
+class TestPipelineRunner:
+    @pytest.fixture
+    def steps(self, tmp_path):
+        """
+        Two chained steps copying a source file, with a run counter.
+        """
+        source = tmp_path / "source.txt"
+        middle = tmp_path / "middle.txt"
+        final = tmp_path / "final.txt"
+        source.write_text("v1")
+        runs = {"first": 0, "second": 0}
+
+        def first():
+            runs["first"] += 1
+            middle.write_text(source.read_text().upper())
+
+        def second():
+            runs["second"] += 1
+            final.write_text(middle.read_text() + "!")
+
+        steps = [
+            PipelineStep("first", lambda: {"source": file_digest(str(source))}, lambda: [str(middle)], first),
+            PipelineStep("second", lambda: {"middle": file_digest(str(middle))}, lambda: [str(final)], second),
+        ]
+        return steps, source, final, runs, str(tmp_path / "state.json")
+
+    def test_up_to_date_steps_skipped(self, steps):
+        """
+        Test that a second run with unchanged inputs is fully cached.
+        """
+        steps, _, final, runs, state_path = steps
+        first_report = run_pipeline(steps=steps, state_path=state_path)
+        assert [s["status"] for s in first_report["steps"]] == ["ran", "ran"]
+
+        second_report = run_pipeline(steps=steps, state_path=state_path)
+        assert [s["status"] for s in second_report["steps"]] == ["cached", "cached"]
+        assert second_report["cache_hits"] == 2
+        assert runs == {"first": 1, "second": 1}
+        assert final.read_text() == "V1!"
+
+    def test_changed_input_reruns_downstream(self, steps):
+        """
+        Test that changing the source reruns both steps, and force reruns everything.
+        """
+        steps, source, final, runs, state_path = steps
+        run_pipeline(steps=steps, state_path=state_path)
+
+        source.write_text("v2")
+        report = run_pipeline(steps=steps, state_path=state_path)
+        assert [s["status"] for s in report["steps"]] == ["ran", "ran"]
+        assert final.read_text() == "V2!"
+
+        report = run_pipeline(force=True, steps=steps, state_path=state_path)
+        assert report["cache_hits"] == 0
+        assert runs == {"first": 3, "second": 3}
+
+    def test_modified_output_reruns_step(self, steps):
+        """
+        Test that an output changed outside the pipeline is rebuilt.
+        """
+        steps, _, final, runs, state_path = steps
+        run_pipeline(steps=steps, state_path=state_path)
+
+        final.write_text("tampered")
+        report = run_pipeline(steps=steps, state_path=state_path)
+        assert [s["status"] for s in report["steps"]] == ["cached", "ran"]
+        assert final.read_text() == "V1!"
+
+
+class TestPipelineRoute:
+    @pytest.fixture
+    def client(self) -> TestClient:
+        """
+        Test client for integration tests
+        """
+        from main import get_application
+
+        app = get_application()
+        client = TestClient(app, base_url="http://testserver")
+        return client
+
+    def test_run_pipeline(self, client):
+        """
+        Test the /pipeline/run endpoint.
+        """
+        response = client.post("/v1/pipeline/run")
+        assert response.status_code == 200
+        json_response = response.json()
+        if "steps" in json_response:
+            assert [step["step"] for step in json_response["steps"]] == ["preprocess", "split", "train"]
+        else:
+            assert "error" in json_response
@@ -0,0 +1,62 @@
+import base64
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from src.services.prediction import (
+    FEATURE_COLUMNS,
+    columns_to_matrix,
+    decode_matrix,
+    format_predictions,
+    predict_matrix,
+)
+
+
+class TestPrediction:
+    @pytest.fixture
+    def model(self) -> RandomForestClassifier:
+        """
+        Small classifier trained on synthetic iris-shaped data.
+        """
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.random((60, 4)), columns=FEATURE_COLUMNS)
+        y = np.arange(60) % 3
+        return RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+
+    def test_columns_to_matrix(self):
+        """
+        Test that feature columns are packed in FEATURE_COLUMNS order.
+        """
+        columns = {name: [float(i), float(i) + 0.5] for i, name in enumerate(FEATURE_COLUMNS)}
+        matrix = columns_to_matrix(columns)
+        assert matrix.dtype == np.float32
+        assert matrix.tolist() == [[0.0, 1.0, 2.0, 3.0], [0.5, 1.5, 2.5, 3.5]]
+
+    def test_columns_to_matrix_missing_feature(self):
+        """
+        Test that a missing feature column is rejected.
+        """
+        with pytest.raises(ValueError):
+            columns_to_matrix({"SepalLengthCm": [1.0]})
+
+    def test_decode_matrix(self):
+        """
+        Test decoding a base64 packed float32 matrix.
+        """
+        expected = np.arange(8, dtype="<f4").reshape(2, 4)
+        matrix = decode_matrix(base64.b64encode(expected.tobytes()).decode())
+        assert np.array_equal(matrix, expected)
+
+        with pytest.raises(ValueError):
+            decode_matrix(base64.b64encode(b"\0" * 12).decode())
+
+    def test_predict_matrix(self, model):
+        """
+        Test that vectorized predictions match the estimator.
+        """
+        matrix = np.random.default_rng(1).random((20, 4)).astype(np.float32)
+        result = predict_matrix(model, matrix, proba=True)
+        expected = model.predict(pd.DataFrame(matrix, columns=FEATURE_COLUMNS))
+        assert np.array_equal(result["predictions"], expected)
+        assert result["probabilities"].shape == (20, 3)
+        assert format_predictions(np.array([0, 2])) == ["0 (Iris-setosa)", "2 (Iris-virginica)"]
@@ -0,0 +1,80 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from src.services import rate_limit
+from src.services.rate_limit import MemoryRateLimiter, create_rate_limiter, parse_limit
+
+
+class TestRateLimiter:
+    @pytest.fixture(params=["memory", "sqlite"])
+    def limiter(self, request, tmp_path):
+        return create_rate_limiter(request.param, str(tmp_path / "limits.sqlite"))
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+        return now
+
+    def test_limit_and_sliding_window(self, limiter, clock):
+        """
+        Test the limit within a window and the weighted carry-over to the next one.
+        """
+        assert [limiter.hit("k", 3, 10).allowed for _ in range(4)] == [True, True, True, False]
+        assert limiter.hit("other", 3, 10).allowed
+
+        # Halfway through the next window, half of the 3 previous requests still count.
+        clock[0] = 1015.0
+        assert [limiter.hit("k", 3, 10).allowed for _ in range(2)] == [True, False]
+        # 1.5 + 1 requests are counted; one more fits once the old ones weigh 1.
+        result = limiter.hit("k", 3, 10)
+        assert result.retry_after == pytest.approx(10 / 6)
+
+    def test_idle_keys_are_evicted(self, clock):
+        """
+        Test that the in-process limiter forgets idle keys and stays bounded.
+        """
+        limiter = MemoryRateLimiter(max_keys=3)
+        for i in range(5):
+            limiter.hit(f"k{i}", 1, 10)
+        assert len(limiter) == 3
+
+        clock[0] += 30
+        limiter.hit("fresh", 1, 10)
+        assert len(limiter) == 1
+
+    def test_sqlite_from_threads(self, tmp_path):
+        """
+        Test that concurrent hits from several threads are all counted exactly once.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        limiter = create_rate_limiter("sqlite", str(tmp_path / "missing" / "limits.sqlite"))
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: limiter.hit("k", 50, 60).allowed, range(60)))
+        assert results.count(True) == 50
+        assert limiter._calls == 60
+
+    def test_parse_limit(self):
+        assert parse_limit("600/60") == (600, 60.0)
+
+
+class TestRateLimitedDependency:
+    def test_returns_429(self, monkeypatch):
+        """
+        Test that the dependency rejects callers over their budget with Retry-After.
+        """
+        from src.api.dependencies import rate_limit as dependencies
+
+        monkeypatch.setattr(dependencies, "rate_limiter", MemoryRateLimiter())
+        app = FastAPI()
+
+        @app.get("/expensive", dependencies=[Depends(dependencies.rate_limited("expensive", 2, 60))])
+        def expensive():
+            return {"ok": True}
+
+        client = TestClient(app)
+        assert [client.get("/expensive").status_code for _ in range(3)] == [200, 200, 429]
+        response = client.get("/expensive")
+        assert response.json()["detail"] == "Rate limit exceeded"
+        assert int(response.headers["Retry-After"]) >= 1
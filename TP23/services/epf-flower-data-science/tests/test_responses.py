@@ -0,0 +1,47 @@
+import json
+
+import numpy as np
+import pandas as pd
+from src.api.responses import FastJSONResponse, dumps
+
+
+class TestFastJSONResponse:
+    def test_numpy_arrays_and_scalars(self):
+        """
+        Test that numeric arrays, string arrays, views and scalars are encoded.
+        """
+        matrix = np.arange(6, dtype=np.float32).reshape(2, 3)
+        content = {
+            "codes": np.array([0, 2, 1], dtype=np.int8),
+            "labels": np.array(["Iris-setosa", "Iris-virginica"]),
+            "column": matrix[:, 1],
+            "score": np.float64(0.5),
+        }
+        assert json.loads(dumps(content)) == {
+            "codes": [0, 2, 1],
+            "labels": ["Iris-setosa", "Iris-virginica"],
+            "column": [1.0, 4.0],
+            "score": 0.5,
+        }
+
+    def test_frames_become_records(self):
+        """
+        Test that frames are encoded as records and series as values, with NaN as null.
+        """
+        frame = pd.DataFrame({"Id": [1, 2], "SepalLengthCm": [5.1, np.nan], "Species": ["a", "b"]})
+        assert json.loads(dumps({"rows": frame, "ids": frame["Id"]})) == {
+            "rows": [
+                {"Id": 1, "SepalLengthCm": 5.1, "Species": "a"},
+                {"Id": 2, "SepalLengthCm": None, "Species": "b"},
+            ],
+            "ids": [1, 2],
+        }
+
+    def test_response_body(self):
+        """
+        Test that the response renders its content with the fast encoder.
+        """
+        response = FastJSONResponse(pd.DataFrame({"x": [1.5]}), headers={"X-Next-Offset": "1"})
+        assert response.body == b'[{"x":1.5}]'
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["x-next-offset"] == "1"
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import pytest
+from firestore import MemoryFirestoreClient
+from src.services.revocation import (
+    FirestoreRevocationStore,
+    MemoryRevocationStore,
+    SqliteRevocationStore,
+    create_revocation_store,
+)
+
+
+class TestRevocationStores:
+    @pytest.fixture(params=["memory", "sqlite", "firestore"])
+    def store(self, request, tmp_path):
+        """
+        One store per backend, the firestore one on the in-memory stand-in.
+        """
+        return create_revocation_store(
+            request.param,
+            sqlite_path=str(tmp_path / "tokens.sqlite"),
+            firestore_client=MemoryFirestoreClient(),
+        )
+
+    def test_revoke(self, store):
+        """
+        Test that a revoked token is reported until it expires.
+        """
+        async def scenario():
+            assert not await store.is_revoked("token-a")
+            assert await store.revoke("token-a", time.time() + 60)
+            assert not await store.revoke("token-a", time.time() + 60)
+            assert await store.revoke("token-b", time.time() - 1)
+            return await store.is_revoked("token-a"), await store.is_revoked("token-b")
+
+        assert asyncio.run(scenario()) == (True, False)
+
+    def test_backends(self, tmp_path):
+        """
+        Test the backend selection.
+        """
+        assert isinstance(create_revocation_store("memory"), MemoryRevocationStore)
+        assert isinstance(create_revocation_store("sqlite", str(tmp_path / "t.sqlite")), SqliteRevocationStore)
+        assert isinstance(create_revocation_store("firestore", firestore_client=MemoryFirestoreClient()), FirestoreRevocationStore)
+        with pytest.raises(ValueError):
+            create_revocation_store("redis")
+
+    def test_sqlite_shared_between_workers(self, tmp_path):
+        """
+        Test that a revocation is seen through another connection at once.
+        """
+        path = str(tmp_path / "missing" / "tokens.sqlite")
+        worker_a, worker_b = SqliteRevocationStore(path), SqliteRevocationStore(path)
+        asyncio.run(worker_a.revoke("token-a", time.time() + 60))
+        assert asyncio.run(worker_b.is_revoked("token-a"))
+
+    def test_expired_entries_are_purged(self):
+        """
+        Test that the in-process store drops expired entries.
+        """
+        store = MemoryRevocationStore()
+        asyncio.run(store.revoke("old", time.time() - 1))
+        asyncio.run(store.revoke("new", time.time() + 60))
+        assert len(store._revoked) == 1
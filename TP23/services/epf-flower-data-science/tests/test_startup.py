@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["pandas", "sklearn", "joblib", "kaggle", "google.cloud.firestore", "google.api_core", "grpc"]
+STARTUP_IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1000"))
+
+_PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{"elapsed_ms": elapsed_ms, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+class TestStartup:
+    def test_import_is_light(self):
+        """
+        Test that importing the app in a fresh interpreter defers the ML stack
+        and stays within the import-time budget (best of three runs).
+        """
+        results = []
+        for _ in range(3):
+            output = subprocess.run(
+                [sys.executable, "-c", _PROBE],
+                cwd=SERVICE_ROOT,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+        assert all(result["loaded"] == [] for result in results)
+        assert min(result["elapsed_ms"] for result in results) < STARTUP_IMPORT_BUDGET_MS
@@ -0,0 +1,70 @@
+import time
+
+import pytest
+from src.services.tokens import InvalidToken, TokenSigner
+
+
+class TestTokenSigner:
+    @pytest.fixture
+    def signer(self) -> TokenSigner:
+        return TokenSigner("test-secret", ttl=60)
+
+    def test_round_trip(self, signer):
+        """
+        Test that an issued token verifies to its claims.
+        """
+        token, expires_at = signer.issue("a@b.c", "admin")
+        claims = signer.verify(token)
+        assert claims["sub"] == "a@b.c"
+        assert claims["role"] == "admin"
+        assert claims["exp"] == expires_at
+        assert signer.issue("a@b.c", "admin")[0] != token
+
+    def test_verification_is_cached(self, signer):
+        """
+        Test that a repeated token is served from the cache.
+        """
+        token, _ = signer.issue("a@b.c", "user")
+        signer.verify(token)
+        signer.verify(token)
+        assert signer.cache.stats()["hits"] == 1
+
+    def test_rejects_forged_tokens(self, signer):
+        """
+        Test that tokens signed with another secret or tampered with fail.
+        """
+        token, _ = TokenSigner("other-secret").issue("a@b.c", "admin")
+        with pytest.raises(InvalidToken):
+            signer.verify(token)
+        with pytest.raises(InvalidToken):
+            signer.verify("token-for-a@b.c")
+
+        header, payload, signature = signer.issue("a@b.c", "user")[0].split(".")
+        with pytest.raises(InvalidToken):
+            signer.verify(f"{header}.{payload[:-2]}xx.{signature}")
+
+    def test_rejects_expired_tokens(self):
+        """
+        Test that an expired token fails.
+        """
+        signer = TokenSigner("test-secret", ttl=-1)
+        token, expires_at = signer.issue("a@b.c", "user")
+        assert expires_at < time.time()
+        with pytest.raises(InvalidToken, match="expired"):
+            signer.verify(token)
+
+    def test_secret_is_required_outside_local(self, monkeypatch):
+        """
+        Test that a missing TOKEN_SECRET fails outside local runs and is random otherwise.
+        """
+        from src.services import tokens
+
+        monkeypatch.delenv("TOKEN_SECRET", raising=False)
+        monkeypatch.setattr(tokens, "APP_ENV", "prd")
+        with pytest.raises(RuntimeError):
+            tokens._secret()
+
+        monkeypatch.setattr(tokens, "APP_ENV", "local")
+        assert tokens._secret() != tokens._secret()
+        monkeypatch.setenv("TOKEN_SECRET", "configured")
+        assert tokens._secret() == "configured"
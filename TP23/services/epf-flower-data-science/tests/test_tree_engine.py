@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from src.services.tree_engine import CompiledForest, export_forest, load_or_compile
+
+
+class TestCompiledForest:
+    @pytest.fixture
+    def data(self):
+        """
+        Synthetic iris-shaped training data.
+        """
+        rng = np.random.default_rng(42)
+        X = rng.normal(loc=[5.8, 3.0, 3.7, 1.2], scale=[0.8, 0.4, 1.7, 0.7], size=(150, 4))
+        y = np.digitize(X[:, 2] + rng.normal(scale=0.5, size=150), [2.5, 4.8])
+        return X, y
+
+    @pytest.fixture
+    def model(self, data) -> RandomForestClassifier:
+        """
+        Forest trained the same way as train_model().
+        """
+        X, y = data
+        return RandomForestClassifier(n_estimators=100, criterion="gini", random_state=42).fit(X, y)
+
+    def test_parity_with_sklearn(self, model, data):
+        """
+        Test that probabilities and predictions are identical to sklearn's.
+        """
+        X, _ = data
+        rng = np.random.default_rng(0)
+        # Training rows sit exactly on split thresholds; random rows cover the rest.
+        X_test = np.vstack([X, rng.normal(loc=X.mean(0), scale=X.std(0) * 2, size=(1000, 4))])
+
+        forest = CompiledForest.from_sklearn(model)
+        assert np.array_equal(forest.predict_proba(X_test), model.predict_proba(X_test))
+        assert np.array_equal(forest.predict(X_test), model.predict(X_test))
+        assert np.array_equal(forest.predict(X_test[:1]), model.predict(X_test[:1]))
+
+    def test_export_and_load(self, model, data, tmp_path):
+        """
+        Test that the exported arrays are reused only for the matching model version.
+        """
+        X, _ = data
+        path = str(tmp_path / "model.npz")
+        export_forest(model, "v1", path)
+
+        loaded = CompiledForest.load(path)
+        assert loaded.source_version == "v1"
+        assert np.array_equal(loaded.predict_proba(X), model.predict_proba(X))
+
+        assert load_or_compile(model, "v1", path).source_version == "v1"
+        assert load_or_compile(model, "v2", path).source_version == "v2"
+        assert load_or_compile({"not": "a forest"}, "v3", path) is None
+
+    def test_invalid_input(self, model):
+        """
+        Test that inputs with the wrong width or NaN values are rejected.
+        """
+        forest = CompiledForest.from_sklearn(model)
+        with pytest.raises(ValueError):
+            forest.predict(np.zeros((2, 3)))
+        with pytest.raises(ValueError):
+            forest.predict(np.full((1, 4), np.nan))
+
+    @pytest.mark.parametrize("value", [np.inf, -np.inf, 1e300])
+    def test_non_finite_input_rejected_like_sklearn(self, model, value):
+        """
+        Test that rows sklearn refuses as non-finite are refused too.
+        """
+        X = np.array([[5.1, 3.5, 1.4, 0.2], [6.0, value, 4.5, 1.5]])
+        forest = CompiledForest.from_sklearn(model)
+        with pytest.raises(ValueError):
+            model.predict(X)
+        with pytest.raises(ValueError, match="infinity"):
+            forest.predict(X)
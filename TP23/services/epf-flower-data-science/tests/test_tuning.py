@@ -0,0 +1,58 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from src.services import tuning
+from src.services.data import DatasetStore
+from src.services.tuning import build_candidates, tune
+
+
+class TestTuning:
+    @pytest.fixture
+    def store(self, tmp_path, monkeypatch) -> DatasetStore:
+        """
+        Dataset store with three well separated classes.
+        """
+        rng = np.random.default_rng(0)
+        y = np.repeat([0, 1, 2], 30)
+        X = pd.DataFrame({"a": y * 10 + rng.random(90), "b": rng.random(90)})
+        store = DatasetStore(str(tmp_path))
+        store.save("train", X)
+        store.save("y_train", pd.Series(y, name="Species").to_frame())
+
+        monkeypatch.setattr(tuning, "dataset_store", store)
+        monkeypatch.setattr(tuning, "TUNING_DIR", str(tmp_path / "tuning"))
+        return store
+
+    def test_build_candidates(self):
+        """
+        Test grid enumeration and random sampling of candidates.
+        """
+        grid = {"n_estimators": [10, 20], "criterion": ["gini", "entropy"], "max_depth": [None]}
+        candidates = build_candidates(grid)
+        assert len(candidates) == 4
+        assert {"criterion": "gini", "max_depth": None, "n_estimators": 10} in candidates
+
+        sampled = build_candidates(grid, search="random", n_iter=2)
+        assert len(sampled) == 2
+        assert all(candidate in candidates for candidate in sampled)
+
+    def test_tune_prunes_worse_candidates(self, store):
+        """
+        Test that clearly worse candidates stop early and the best one wins.
+        """
+        result = tune(
+            param_grid={"n_estimators": [5], "max_depth": [1, None]},
+            cv=4,
+            tolerance=0.1,
+        )
+        assert result["best_params"] == {"max_depth": None, "n_estimators": 5}
+        assert result["best_score"] > 0.9
+
+        shallow = next(c for c in result["candidates"] if c["params"]["max_depth"] == 1)
+        assert shallow["pruned"]
+        assert shallow["folds_evaluated"] == 2
+        # The run's matrices are removed; the shared pool stays up for the next run.
+        assert os.listdir(tuning.TUNING_DIR) == []
+        assert tuning._executor is not None
+        tuning.shutdown()